@@ -100,6 +100,14 @@ export const createCompanyInterview = async (req, res) => {
       description,
       numOfQns,
       embedding: data.embedding,
+      stipendMin: data.stipendMin,
+      stipendMax: data.stipendMax,
+      lastDateDay: data.lastDateDay,
+      typeKey: data.typeKey,
+      jobTypeKey: data.jobTypeKey,
+      skillIds: data.skillIds,
+      categoryId: data.categoryId,
+      categoryVersion: data.categoryVersion,
       locationName: location,
       location: {
         type: 'Point',
@@ -108,6 +116,15 @@ export const createCompanyInterview = async (req, res) => {
     });
     await newData.save();
 
+    // cached /recommend responses predate this posting
+    try {
+      await axios.post("http://127.0.0.1:5000/recommend/invalidate");
+    } catch (err) {
+      if (err.response?.status !== 404) {
+        console.log("Recommendation cache invalidation failed:", err.message);
+      }
+    }
+
     const eligibleUsers = await axios.post("http://127.0.0.1:5000/eligible_users", {
       internshipId: newData._id,
     });
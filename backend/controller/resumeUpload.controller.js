@@ -42,7 +42,7 @@ export const uploadResume = async (req, res) => {
 
     const resume_embedding = await axios.post(
       "http://127.0.0.1:5000/embed_candidate",
-      { summary: resumeReview },
+      { summary: resumeReview, resumeData: resume_data },
     );
 
     if (!resume_embedding.data.embedding) {
@@ -86,7 +86,8 @@ export const uploadResume = async (req, res) => {
         resumeLink: cloudinaryRes.data.secure_url,
         resumeJSONdata: resume_data,
         resumeReview: resumeReview,
-        embedding: embedding
+        embedding: embedding,
+        rerankText: resume_embedding.data.rerankText
       },
       { new: true, upsert: true }
     ).select("-embedding");
@@ -13,6 +13,17 @@ const InternshipSchema = new mongoose.Schema(
     lastDate: { type: String, trim: true, required: true },
     description: { type: String, trim: true, required: true },
     numOfQns: { type: Number, required: true },
+
+    // typed copies returned by /embed, used by $vectorSearch pre-filters
+    stipendMin: { type: Number },
+    stipendMax: { type: Number },
+    lastDateDay: { type: Number },
+    typeKey: { type: String },
+    jobTypeKey: { type: String },
+    skillIds: { type: [Number], default: undefined },
+    categoryId: { type: Number },
+    categoryVersion: { type: Number },
+
     embedding: {
       type: [Number],
       required: true
@@ -29,6 +29,9 @@ const resumeDataSchema = new Schema(
       required: true,
       index: "2dsphere"
     },
+    rerankText: {
+      type: String,
+    },
 
   },
   {
@@ -1,10 +1,14 @@
-from flask import Flask
+from flask import Flask, request
 from flask_cors import CORS   
 
 from routes.recommend_routes import bp as recommend_bp
 from routes.embed_routes import bp as embed_bp
 from routes.eligibility_routes import bp as eligibility_bp
 from routes.utility_routes import bp as utility_bp  
+from routes.metrics_routes import bp as metrics_bp
+from db.mongo import warmup
+from utils.tracing import start_trace, finish_trace
+from config.config import Config
 
 app = Flask(__name__)
 
@@ -14,6 +18,19 @@ app.register_blueprint(recommend_bp)
 app.register_blueprint(embed_bp)
 app.register_blueprint(eligibility_bp)
 app.register_blueprint(utility_bp)   
+app.register_blueprint(metrics_bp)
+
+
+@app.before_request
+def start_request_trace():
+    start_trace()
+
+
+@app.after_request
+def finish_request_trace(response):
+    return finish_trace(response, request.endpoint, server_timing=Config.SERVER_TIMING)
+
+warmup()
 
 if __name__ == "__main__":
     print("Server running...")
@@ -0,0 +1,136 @@
+"""Async serving mode.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+The endpoints that spend most of their time waiting on Mongo, HF, Jina,
+Pinecone or edge-tts are served by an async Quart app on shared
+non-blocking clients. Every other route is forwarded to the regular Flask
+app, so both modes expose the same API.
+"""
+import asyncio
+import os
+from asgiref.wsgi import WsgiToAsgi
+from quart import Quart, request, jsonify, Response
+from quart_cors import cors
+
+from app import app as flask_app
+from services.recommendation_service import recommend_async, ranked_recommendations_async, ndjson_lines
+from services.eligibility_matrix_service import serve_eligible_users_async
+from services.embedding_service import embed_job_async, embed_candidate_async
+from services.retrieval_service import retrieve_resume_chunks_async
+from services.utility_service import speak_service_async
+from utils.tracing import start_trace, finish_trace, stage
+from config.config import Config
+
+async_app = cors(Quart(__name__), allow_origin="*")
+
+
+@async_app.before_request
+async def start_request_trace():
+    start_trace()
+
+
+@async_app.after_request
+async def finish_request_trace(response):
+    return finish_trace(response, request.endpoint, server_timing=Config.SERVER_TIMING)
+
+
+def respond(result):
+    if isinstance(result, tuple):
+        body, status = result
+        return jsonify(body), status
+    return jsonify(result)
+
+
+@async_app.route("/recommend", methods=["POST"])
+async def recommend_route():
+    data = await request.get_json()
+
+    if data and data.get("stream"):
+        ranked = await ranked_recommendations_async(data)
+        if isinstance(ranked, tuple):
+            return respond(ranked)
+
+        async def lines():
+            for line in ndjson_lines(ranked):
+                yield line.encode("utf-8")
+
+        return Response(lines(), mimetype="application/x-ndjson")
+
+    result = await recommend_async(data)
+
+    with stage("recommend.serialize"):
+        return respond(result)
+
+
+@async_app.route("/eligible_users", methods=["POST"])
+async def eligible_users_route():
+    result = await serve_eligible_users_async(await request.get_json())
+
+    with stage("eligibility.serialize"):
+        return respond(result)
+
+
+@async_app.route("/embed", methods=["POST"])
+async def embed_route():
+    return respond(await embed_job_async(await request.get_json()))
+
+
+@async_app.route("/embed_candidate", methods=["POST"])
+async def embed_candidate_route():
+    return respond(await embed_candidate_async(await request.get_json()))
+
+
+@async_app.route("/retrieve_resume_chunks", methods=["POST"])
+async def retrieve_resume_chunks_route():
+    data = await request.get_json()
+
+    user_id = data.get("userId")
+    query = data.get("query")
+
+    if not user_id or not query:
+        return jsonify({"error": "Missing userId or query"}), 400
+
+    chunks = await retrieve_resume_chunks_async(user_id, query)
+
+    return jsonify({
+        "query": query,
+        "results": chunks
+    })
+
+
+@async_app.route("/speak", methods=["POST"])
+async def speak_route():
+    try:
+        data = await request.get_json() or {}
+        user_text = data.get("text", "Hello, how can I help you?")
+
+        result = await speak_service_async(user_text)
+
+        if isinstance(result, tuple):
+            return respond(result)
+
+        def read_and_remove(file_path):
+            with open(file_path, "rb") as f:
+                audio = f.read()
+            os.remove(file_path)
+            return audio
+
+        audio = await asyncio.to_thread(read_and_remove, result)
+
+        return Response(audio, mimetype="audio/mpeg")
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+ASYNC_ROUTES = {rule.rule for rule in async_app.url_map.iter_rules() if rule.endpoint != "static"}
+
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan" or scope.get("path") in ASYNC_ROUTES:
+        await async_app(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
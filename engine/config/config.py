@@ -8,5 +8,108 @@ class Config:
     DB_NAME = os.getenv("DB_NAME")
     COLLECTION_NAME = os.getenv("COLLECTION_NAME")
 
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000"))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000"))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+    MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+
+    # adds per-stage timings to every response as a Server-Timing header
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
     BI_ENCODER_MODEL = "BAAI/bge-large-en-v1.5"
-    CROSS_ENCODER_MODEL = "cross-encoder/ms-marco-electra-base"
\ No newline at end of file
+    CROSS_ENCODER_MODEL = "cross-encoder/ms-marco-electra-base"
+
+    # "atlas" runs $vectorSearch per request, "local" serves from the in-process index
+    RECOMMEND_BACKEND = os.getenv("RECOMMEND_BACKEND", "atlas")
+    LOCAL_INDEX_REFRESH_SECONDS = int(os.getenv("LOCAL_INDEX_REFRESH_SECONDS", "300"))
+    LOCAL_INDEX_WATCH = os.getenv("LOCAL_INDEX_WATCH", "false").lower() == "true"
+
+    # push filters into $vectorSearch.filter; needs the filter fields in vector_index
+    # (scripts/update_vector_index.py) instead of a $match after the 200 nearest
+    RECOMMEND_PREFILTER = os.getenv("RECOMMEND_PREFILTER", "false").lower() == "true"
+    RECOMMEND_NUM_CANDIDATES = int(os.getenv("RECOMMEND_NUM_CANDIDATES", "500"))
+    RECOMMEND_PREFILTER_NUM_CANDIDATES = int(os.getenv("RECOMMEND_PREFILTER_NUM_CANDIDATES", "300"))
+    RECOMMEND_HIDE_EXPIRED = os.getenv("RECOMMEND_HIDE_EXPIRED", "false").lower() == "true"
+
+    # cascade: only the stage-1 (vector + skill) head near the top-10 cut goes to the reranker
+    RERANK_CASCADE = os.getenv("RERANK_CASCADE", "false").lower() == "true"
+    CASCADE_MIN_DEPTH = int(os.getenv("CASCADE_MIN_DEPTH", "20"))
+    CASCADE_MAX_DEPTH = int(os.getenv("CASCADE_MAX_DEPTH", "60"))
+    CASCADE_SCORE_MARGIN = float(os.getenv("CASCADE_SCORE_MARGIN", "0.15"))
+    CASCADE_DECISIVE_GAP = float(os.getenv("CASCADE_DECISIVE_GAP", "0.4"))  # 0.4 x a [0, 1] cross score
+
+    # maximal marginal relevance over the top candidates' embeddings (1.0 = pure score order)
+    RECOMMEND_MMR = os.getenv("RECOMMEND_MMR", "false").lower() == "true"
+    MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+    MMR_TOP_K = int(os.getenv("MMR_TOP_K", "50"))
+
+    # /recommend response cache; RESULT_CACHE_REDIS_URL shares it across workers
+    RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+    RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", "300"))
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "2048"))
+    RESULT_CACHE_PRECISION = int(os.getenv("RESULT_CACHE_PRECISION", "4"))  # embedding decimals kept in the key
+    RESULT_CACHE_REDIS_URL = os.getenv("RESULT_CACHE_REDIS_URL")
+    RESULT_CACHE_WATCH = os.getenv("RESULT_CACHE_WATCH", "false").lower() == "true"
+
+    # ranked lists kept for "load more" cursors
+    RECOMMEND_PAGE_TTL_SECONDS = int(os.getenv("RECOMMEND_PAGE_TTL_SECONDS", "600"))
+    RECOMMEND_PAGE_MAX_LISTS = int(os.getenv("RECOMMEND_PAGE_MAX_LISTS", "1000"))
+    RECOMMEND_MAX_PAGE_SIZE = int(os.getenv("RECOMMEND_MAX_PAGE_SIZE", "50"))
+
+    LOCATION_TABLE_REFRESH_SECONDS = int(os.getenv("LOCATION_TABLE_REFRESH_SECONDS", "3600"))
+
+    # "jina" calls the hosted API, "local" runs CROSS_ENCODER_MODEL in-process
+    RERANKER_BACKEND = os.getenv("RERANKER_BACKEND", "jina")
+    RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+    RERANK_MAX_LENGTH = int(os.getenv("RERANK_MAX_LENGTH", "512"))
+    RERANK_CACHE_ENABLED = os.getenv("RERANK_CACHE_ENABLED", "true").lower() == "true"
+    RERANK_CACHE_TTL_SECONDS = int(os.getenv("RERANK_CACHE_TTL_SECONDS", "86400"))
+    RERANK_CACHE_MAX_ENTRIES = int(os.getenv("RERANK_CACHE_MAX_ENTRIES", "200000"))
+    CROSS_ENCODER_DEVICE = os.getenv("CROSS_ENCODER_DEVICE", "cpu")
+    CROSS_ENCODER_BACKEND = os.getenv("CROSS_ENCODER_BACKEND", "torch")  # or "onnx"
+    CROSS_ENCODER_ONNX_FILE = os.getenv("CROSS_ENCODER_ONNX_FILE")
+    CROSS_ENCODER_QUANTIZE = os.getenv("CROSS_ENCODER_QUANTIZE", "false").lower() == "true"
+
+    # "hf" uses the HF inference endpoint, "local" runs BI_ENCODER_MODEL in-process
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hf")
+    EMBED_MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "32"))
+    EMBED_MAX_WAIT_MS = int(os.getenv("EMBED_MAX_WAIT_MS", "10"))
+    EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "4"))  # inference calls in flight per dispatcher
+    RESUME_EMBED_CONCURRENCY = int(os.getenv("RESUME_EMBED_CONCURRENCY", "4"))
+
+    EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE_ENABLED", "true").lower() == "true"
+    EMBED_CACHE_MAX_BYTES = int(os.getenv("EMBED_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH")  # SQLite file for the persistent tier
+
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+    INGEST_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "3"))
+    INGEST_RETRY_BACKOFF_SECONDS = float(os.getenv("INGEST_RETRY_BACKOFF_SECONDS", "2"))
+    INGEST_JOB_RETENTION_SECONDS = int(os.getenv("INGEST_JOB_RETENTION_SECONDS", "3600"))
+    INGEST_JOURNAL_PATH = os.getenv("INGEST_JOURNAL_PATH")  # SQLite journal for queued jobs
+
+    # length budget of the compact resume text sent to the reranker
+    RESUME_RERANK_MAX_CHARS = int(os.getenv("RESUME_RERANK_MAX_CHARS", "1500"))
+
+    # eligible_users keyword prefilter: shared non-stop-word terms required per resume
+    KEYWORD_MIN_OVERLAP = int(os.getenv("KEYWORD_MIN_OVERLAP", "2"))
+    KEYWORD_CACHE_SIZE = int(os.getenv("KEYWORD_CACHE_SIZE", "10000"))
+
+    # precomputed top-K eligible users per internship, served by /eligible_users
+    ELIGIBILITY_MATRIX_ENABLED = os.getenv("ELIGIBILITY_MATRIX_ENABLED", "false").lower() == "true"
+    ELIGIBILITY_COLLECTION = os.getenv("ELIGIBILITY_COLLECTION", "eligibility_matrix")
+    ELIGIBILITY_TOP_K = int(os.getenv("ELIGIBILITY_TOP_K", "50"))
+    ELIGIBILITY_MAX_AGE_SECONDS = int(os.getenv("ELIGIBILITY_MAX_AGE_SECONDS", "86400"))  # 0 = never expire
+    ELIGIBILITY_RESUME_FANOUT = int(os.getenv("ELIGIBILITY_RESUME_FANOUT", "50"))  # postings re-checked per resume change
+    ELIGIBILITY_WORKERS = int(os.getenv("ELIGIBILITY_WORKERS", "2"))
+    ELIGIBILITY_WATCH = os.getenv("ELIGIBILITY_WATCH", "false").lower() == "true"
+
+    # canonical skill names and aliases written at ingest, for skill-overlap scoring
+    SKILL_VOCABULARY_COLLECTION = os.getenv("SKILL_VOCABULARY_COLLECTION", "skill_vocabulary")
+
+    # nearest-centroid categories fit at ingest; recommend() keeps the user's nearest ones
+    CATEGORY_COLLECTION = os.getenv("CATEGORY_COLLECTION", "categories")
+    CATEGORY_MATCH_TOP = int(os.getenv("CATEGORY_MATCH_TOP", "2"))
@@ -1,12 +1,137 @@
-from pymongo import MongoClient
+import threading
+from pymongo import MongoClient, AsyncMongoClient, monitoring
 from config.config import Config
 
-client = MongoClient(Config.MONGO_URI)
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Counts one client's connection pool activity so pool sizing can be
+    checked under load. Each client has its own pool of MONGO_MAX_POOL_SIZE,
+    so each gets its own listener."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "checkins": 0,
+            "checkout_failures": 0,
+            "pools_cleared": 0,
+        }
+        self.checkout_wait_seconds = 0.0
+
+    def _inc(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._inc("pools_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._inc("connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._inc("connections_closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._inc("checkout_failures")
+
+    def connection_checked_out(self, event):
+        with self.lock:
+            self.counters["checkouts"] += 1
+            self.checkout_wait_seconds += getattr(event, "duration", 0) or 0
+
+    def connection_checked_in(self, event):
+        self._inc("checkins")
+
+    def snapshot(self):
+        with self.lock:
+            counters = dict(self.counters)
+            wait = self.checkout_wait_seconds
+
+        max_pool = Config.MONGO_MAX_POOL_SIZE
+        counters["open_connections"] = counters["connections_created"] - counters["connections_closed"]
+        counters["in_use"] = counters["checkouts"] - counters["checkins"]
+        counters["max_pool_size"] = max_pool
+        counters["utilization"] = counters["in_use"] / max_pool if max_pool else 0.0
+        counters["mean_checkout_wait_ms"] = 1000 * wait / counters["checkouts"] if counters["checkouts"] else 0.0
+        return counters
+
+
+# one listener per client, exported with a client="sync|async" label
+pool_metrics = {"sync": PoolMetrics(), "async": PoolMetrics()}
+
+
+def client_options(listener):
+    return {
+        "maxPoolSize": Config.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": Config.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": Config.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": Config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": Config.MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": Config.MONGO_SOCKET_TIMEOUT_MS,
+        "readPreference": Config.MONGO_READ_PREFERENCE,
+        "event_listeners": [listener],
+    }
+
+
+client = MongoClient(Config.MONGO_URI, **client_options(pool_metrics["sync"]))
 db = client[Config.DB_NAME]
 collection = db[Config.COLLECTION_NAME]
 
+async_client = None
+
 def get_collection():
     return collection
 
 def get_db():
-    return db
\ No newline at end of file
+    return db
+
+def get_async_db():
+    """Database handle on the async driver, for the ASGI app. Created lazily so
+    it binds to the running event loop."""
+    global async_client
+
+    if async_client is None:
+        async_client = AsyncMongoClient(Config.MONGO_URI, **client_options(pool_metrics["async"]))
+
+    return async_client[Config.DB_NAME]
+
+def get_async_collection():
+    return get_async_db()[Config.COLLECTION_NAME]
+
+def warmup():
+    """Pings the cluster so server discovery and the first pool connections
+    happen at startup instead of on the first request."""
+    try:
+        client.admin.command("ping")
+        print("MongoDB connection pool ready.")
+        return True
+    except Exception as e:
+        print("MongoDB warmup failed:", e)
+        return False
+
+def health():
+    try:
+        client.admin.command("ping")
+        status = "ok"
+    except Exception as e:
+        status = f"error: {e}"
+
+    return {"mongo": status, "pool": {name: metrics.snapshot() for name, metrics in pool_metrics.items()}}
@@ -39,4 +39,60 @@ def get_models():
     if bi_encoder is None or cross_encoder is None:
         raise RuntimeError("Models not loaded. Call load_models() first.")
 
-    return bi_encoder, cross_encoder
\ No newline at end of file
+    return bi_encoder, cross_encoder
+
+
+def get_bi_encoder():
+    global bi_encoder
+
+    if bi_encoder is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        print(f"Loading bi-encoder model on {device}...")
+        bi_encoder = SentenceTransformer(
+            Config.BI_ENCODER_MODEL,
+            device=device,
+            trust_remote_code=True
+        )
+        print("Bi-encoder loaded.")
+
+    return bi_encoder
+
+
+def load_cross_encoder():
+    """Loads only the cross-encoder, configured for serving reranks on CPU:
+    bounded sequence length, optional ONNX runtime or int8 dynamic quantization."""
+    global cross_encoder
+
+    device = Config.CROSS_ENCODER_DEVICE
+    kwargs = {"device": device, "max_length": Config.RERANK_MAX_LENGTH}
+
+    if Config.CROSS_ENCODER_BACKEND == "onnx":
+        kwargs["backend"] = "onnx"
+        if Config.CROSS_ENCODER_ONNX_FILE:
+            kwargs["model_kwargs"] = {"file_name": Config.CROSS_ENCODER_ONNX_FILE}
+
+    try:
+        print(f"Loading cross-encoder model ({Config.CROSS_ENCODER_BACKEND}, {device})...")
+        model = CrossEncoder(Config.CROSS_ENCODER_MODEL, **kwargs)
+
+        if Config.CROSS_ENCODER_QUANTIZE and Config.CROSS_ENCODER_BACKEND == "torch" and device == "cpu":
+            model.model = torch.quantization.quantize_dynamic(
+                model.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            print("Cross-encoder quantized to int8.")
+
+        cross_encoder = model
+        print("Cross-encoder loaded.")
+
+    except Exception as e:
+        print("Error loading cross-encoder:", str(e))
+        raise e
+
+    return cross_encoder
+
+
+def get_cross_encoder():
+    if cross_encoder is None:
+        load_cross_encoder()
+
+    return cross_encoder
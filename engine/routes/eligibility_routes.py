@@ -1,8 +1,38 @@
 from flask import Blueprint, request, jsonify
-from services.eligibility_service import eligible_users
+from services.eligibility_matrix_service import serve_eligible_users, get_eligibility_matrix
+from utils.tracing import stage
 
 bp = Blueprint("eligibility", __name__)
 
 @bp.route("/eligible_users", methods=["POST"])
 def eligible_users_route():
-    return jsonify(eligible_users(request.get_json()))
\ No newline at end of file
+    result = serve_eligible_users(request.get_json())
+
+    with stage("eligibility.serialize"):
+        return jsonify(result)
+
+
+@bp.route("/eligibility/refresh", methods=["POST"])
+def eligibility_refresh_route():
+    data = request.get_json() or {}
+
+    internship_id = data.get("internshipId")
+    user_id = data.get("userId")
+
+    if not internship_id and not user_id:
+        return jsonify({"error": "Provide 'internshipId' or 'userId'"}), 400
+
+    matrix = get_eligibility_matrix()
+    scheduled = 0
+
+    if internship_id:
+        scheduled += matrix.on_internship_changed(internship_id)
+    if user_id:
+        scheduled += matrix.on_resume_changed(user_id)
+
+    return jsonify({"scheduled": scheduled}), 202
+
+
+@bp.route("/eligibility/stats", methods=["GET"])
+def eligibility_stats_route():
+    return jsonify(get_eligibility_matrix().stats())
@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify
 from services.embedding_service import embed_job, embed_candidate
 from services.resume_vector_service import store_resume_chunks
+from services.ingestion_queue import get_ingestion_queue
 from utils.text_utils import build_resume_text
 from services.retrieval_service import retrieve_resume_chunks
+from services.embedding_dispatcher import dispatcher_stats
+from services.embedding_cache import get_embedding_cache
 
 bp = Blueprint("embed", __name__)
 
@@ -24,11 +27,23 @@ def store_resume_chunks_route():
     if not user_id or not resume_json:
         return jsonify({"error": "Missing userId or resumeData"}), 400
 
-    resume_text = build_resume_text(resume_json)
+    if data.get("wait"):
+        resume_text = build_resume_text(resume_json)
+        return jsonify(store_resume_chunks(user_id, resume_text))
 
-    result = store_resume_chunks(user_id, resume_text)
+    job = get_ingestion_queue().enqueue(user_id, resume_json)
 
-    return jsonify(result)
+    return jsonify({"jobId": job["jobId"], "status": job["status"]}), 202
+
+
+@bp.route("/jobs/<job_id>", methods=["GET"])
+def job_status_route(job_id):
+    job = get_ingestion_queue().get(job_id)
+
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify(job)
 
 
 @bp.route("/retrieve_resume_chunks", methods=["POST"])
@@ -47,3 +62,11 @@ def retrieve_resume_chunks_route():
         "query": query,
         "results": chunks
     })
+
+
+@bp.route("/embedding_stats", methods=["GET"])
+def embedding_stats_route():
+    return jsonify({
+        "dispatchers": dispatcher_stats(),
+        "cache": get_embedding_cache().stats()
+    })
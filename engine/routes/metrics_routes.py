@@ -0,0 +1,8 @@
+from flask import Blueprint, Response
+from services.metrics_service import metrics_text
+
+bp = Blueprint("metrics", __name__)
+
+@bp.route("/metrics", methods=["GET"])
+def metrics_route():
+    return Response(metrics_text(), mimetype="text/plain; version=0.0.4")
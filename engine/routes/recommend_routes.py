@@ -1,8 +1,64 @@
-from flask import Blueprint, request, jsonify
-from services.recommendation_service import recommend
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from services.recommendation_service import recommend, stream_recommendations
+from services.local_index_service import get_local_index
+from services.result_cache import get_result_cache
+from services.cascade_service import cascade_stats
+from services.skill_service import reload_skill_vocabulary
+from services.category_service import reload_category_model
+from utils.tracing import stage
 
 bp = Blueprint("recommend", __name__)
 
 @bp.route("/recommend", methods=["POST"])
 def recommend_route():
-    return jsonify(recommend(request.get_json()))
\ No newline at end of file
+    data = request.get_json()
+
+    if data and data.get("stream"):
+        lines, error = stream_recommendations(data)
+        if error:
+            body, status = error
+            return jsonify(body), status
+        return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+
+    result = recommend(data)
+
+    with stage("recommend.serialize"):
+        return jsonify(result)
+
+
+@bp.route("/refresh_index", methods=["POST"])
+def refresh_index_route():
+    index = get_local_index()
+    index.refresh()
+    reload_skill_vocabulary()
+    reload_category_model()
+
+    cache = get_result_cache()
+    if cache is not None:
+        cache.invalidate()
+
+    return jsonify({"indexed": len(index.docs)})
+
+
+@bp.route("/recommend/invalidate", methods=["POST"])
+def invalidate_recommend_cache_route():
+    cache = get_result_cache()
+    if cache is None:
+        return jsonify({"error": "Result cache is disabled"}), 404
+
+    cache.invalidate()
+    return jsonify(cache.stats())
+
+
+@bp.route("/recommend/cache_stats", methods=["GET"])
+def recommend_cache_stats_route():
+    cache = get_result_cache()
+    if cache is None:
+        return jsonify({"error": "Result cache is disabled"}), 404
+
+    return jsonify(cache.stats())
+
+
+@bp.route("/recommend/cascade_stats", methods=["GET"])
+def recommend_cascade_stats_route():
+    return jsonify(cascade_stats.stats())
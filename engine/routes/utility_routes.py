@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify, send_file, after_this_request
 from services.utility_service import parse_resume_service, speak_service
+from db.mongo import health
+from services.reranker_service import get_score_cache
 
 bp = Blueprint("utility", __name__)
 
@@ -47,4 +49,20 @@ def speak():
         return send_file(file_path, mimetype="audio/mpeg")
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route("/health", methods=["GET"])
+def health_route():
+    result = health()
+    status = 200 if result["mongo"] == "ok" else 503
+    return jsonify(result), status
+
+
+@bp.route("/rerank_cache_stats", methods=["GET"])
+def rerank_cache_stats_route():
+    cache = get_score_cache()
+    if cache is None:
+        return jsonify({"error": "Rerank score cache is disabled"}), 404
+
+    return jsonify(cache.stats())
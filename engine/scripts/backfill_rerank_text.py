@@ -0,0 +1,39 @@
+import os
+import sys
+from pymongo import UpdateOne
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongo import get_db
+from config.config import Config
+from utils.text_utils import build_rerank_text
+
+BATCH_SIZE = 500
+
+
+def main():
+    """Stores rerankText on resumes saved before /embed_candidate returned it."""
+    resumes = get_db()["resumedatas"]
+    cursor = resumes.find({"rerankText": {"$exists": False}}, {"resumeJSONdata": 1})
+
+    updates = []
+    total = 0
+
+    for resume in cursor:
+        text = build_rerank_text(resume.get("resumeJSONdata", ""), Config.RESUME_RERANK_MAX_CHARS)
+        updates.append(UpdateOne({"_id": resume["_id"]}, {"$set": {"rerankText": text}}))
+
+        if len(updates) >= BATCH_SIZE:
+            resumes.bulk_write(updates)
+            total += len(updates)
+            updates = []
+
+    if updates:
+        resumes.bulk_write(updates)
+        total += len(updates)
+
+    print(f"Backfilled rerankText for {total} resumes.")
+
+
+if __name__ == "__main__":
+    main()
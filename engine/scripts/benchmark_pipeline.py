@@ -0,0 +1,442 @@
+"""Offline benchmark of the recommendation, eligibility and embedding paths.
+
+Runs the real recommend(), eligible_users() and embed_job() code against a
+synthetic corpus in the ingest_data.py schema, with local stand-ins for the
+vector search (the in-process LocalVectorIndex), the reranker, the embedder
+and Mongo. Nothing leaves the machine.
+
+    BENCH_SIZES=1000,10000,100000 python scripts/benchmark_pipeline.py
+
+Settings (environment):
+    BENCH_SIZES          internship corpus sizes (1000000 needs ~8GB RAM at 1024 dims)
+    BENCH_DIM            embedding dimension (1024, as bge-large)
+    BENCH_RESUMES        resumes for the eligibility runs
+    BENCH_REQUESTS       timed requests per scenario
+    BENCH_CONCURRENCY    client threads
+    BENCH_RERANK_MS      simulated reranker latency per call
+    BENCH_EMBED_MS       simulated embedder latency per batch
+    BENCH_CACHES         keep the result and rerank caches on (off by default)
+    BENCH_OUTPUT         write results as JSON here
+    BENCH_BASELINE       compare against an earlier BENCH_OUTPUT; exits 1 when a
+                         p95 regresses by more than BENCH_TOLERANCE (0.2 = 20%)
+"""
+import os
+import sys
+import json
+import time
+import io
+import hashlib
+import resource
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# db.mongo builds its client at import; it never connects during the benchmark
+os.environ.setdefault("DB_NAME", "benchmark")
+os.environ.setdefault("COLLECTION_NAME", "new_internships_data")
+
+from bson import ObjectId
+from config.config import Config
+from utils.filters import typed_fields, build_columns
+from utils.text_utils import term_set
+from utils.skills import SkillVocabulary, posting_skills
+from utils.categories import fit_centroids, nearest_categories
+from services.category_service import CategoryModel
+from services import recommendation_service, eligibility_service, embedding_service, reranker_service
+from services import local_index_service, location_service, skill_service, category_service
+from services.local_index_service import LocalVectorIndex
+from services.location_service import CityLookup
+from services.embedding_dispatcher import EmbeddingDispatcher
+
+SIZES = [int(s) for s in os.getenv("BENCH_SIZES", "1000,10000,100000").split(",") if s.strip()]
+DIM = int(os.getenv("BENCH_DIM", "1024"))
+NUM_RESUMES = int(os.getenv("BENCH_RESUMES", "5000"))
+NUM_REQUESTS = int(os.getenv("BENCH_REQUESTS", "200"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "4"))
+RERANK_MS = float(os.getenv("BENCH_RERANK_MS", "0"))
+EMBED_MS = float(os.getenv("BENCH_EMBED_MS", "0"))
+KEEP_CACHES = os.getenv("BENCH_CACHES", "false").lower() == "true"
+OUTPUT = os.getenv("BENCH_OUTPUT")
+BASELINE = os.getenv("BENCH_BASELINE")
+TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "0.2"))
+
+TOPICS = {
+    "software": {
+        "titles": ["Software Developer", "Backend Engineer", "Web Developer", "Full Stack Developer"],
+        "skills": ["python", "java", "react", "node.js", "sql", "docker", "django", "git"],
+        "summary": "software development engineer building web applications",
+    },
+    "data": {
+        "titles": ["Data Analyst", "Machine Learning Engineer", "Data Scientist"],
+        "skills": ["python", "pandas", "sql", "statistics", "tableau", "pytorch", "excel"],
+        "summary": "data analysis and machine learning projects",
+    },
+    "marketing": {
+        "titles": ["Digital Marketing", "SEO Executive", "Content Marketing"],
+        "skills": ["seo", "social media", "campaign", "copywriting", "google ads", "analytics"],
+        "summary": "marketing campaigns and social media growth",
+    },
+    "teaching": {
+        "titles": ["Teaching Assistant", "Math Tutor", "Education Coordinator"],
+        "skills": ["teaching", "mathematics", "lesson planning", "communication", "english"],
+        "summary": "teaching and tutoring students",
+    },
+    "design": {
+        "titles": ["UI/UX Designer", "Graphic Designer", "Product Designer"],
+        "skills": ["figma", "photoshop", "illustrator", "wireframing", "prototyping"],
+        "summary": "product and graphic design portfolio",
+    },
+    "finance": {
+        "titles": ["Finance Intern", "Accounts Assistant", "Investment Analyst"],
+        "skills": ["excel", "accounting", "tally", "financial modelling", "gst"],
+        "summary": "finance, accounting and investment analysis",
+    },
+}
+
+CITIES = {
+    "Delhi": (28.61, 77.21), "Mumbai": (19.08, 72.88), "Bengaluru": (12.97, 77.59),
+    "Pune": (18.52, 73.86), "Hyderabad": (17.39, 78.49), "Chennai": (13.08, 80.27),
+    "Kolkata": (22.57, 88.36), "Jaipur": (26.91, 75.79), "Ahmedabad": (23.02, 72.57),
+}
+
+DURATIONS = ["1 Month", "2 Months", "3 Months", "6 Months"]
+TYPES = ["Remote", "In Office", "Hybrid"]
+JOB_TYPES = ["Full Time", "Part Time"]
+STIPENDS = ["Unpaid", "₹5000", "₹8000-12000", "₹10000-15000", "₹15000", "₹20000-25000"]
+
+FILTER_TEMPLATES = [
+    {},
+    {"duration": ["3 Months"]},
+    {"type": ["Remote"]},
+    {"stipend": ["₹10000-20000"]},
+    {"available": ["open"]},
+    {"location": ["Delhi", "Pune"]},
+    {"duration": ["2 Months", "6 Months"], "type": ["Hybrid"], "stipend": ["₹5000-15000"]},
+]
+
+
+def unit_rows(matrix):
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix
+
+
+def topic_centroids(rng):
+    return unit_rows(rng.standard_normal((len(TOPICS), DIM)).astype(np.float32))
+
+
+def clustered_vectors(rng, centroids, topic_ids, noise=0.9):
+    """Unit vectors around each topic centroid; `noise` is the norm of the
+    random offset (0.9 gives a cosine of about 0.75 to the centroid)."""
+    offsets = rng.standard_normal((len(topic_ids), DIM)).astype(np.float32) / np.float32(np.sqrt(DIM))
+    return unit_rows(centroids[topic_ids] + np.float32(noise) * offsets)
+
+
+def synthetic_internships(rng, centroids, n):
+    """Internship documents in the ingest_data.py schema (typed fields and
+    skill ids included) and their float32 embedding matrix."""
+    topic_names = list(TOPICS)
+    topic_ids = rng.integers(0, len(topic_names), n)
+    matrix = clustered_vectors(rng, centroids, topic_ids)
+    today = date.today()
+    cities = list(CITIES)
+
+    docs = []
+    for i, t in enumerate(topic_ids):
+        topic = TOPICS[topic_names[t]]
+        city = cities[i % len(cities)]
+        lat, lon = CITIES[city]
+        skills = list(rng.choice(topic["skills"], 3, replace=False))
+        title = topic["titles"][i % len(topic["titles"])]
+
+        doc = {
+            "_id": ObjectId(),
+            "jobTitle": title,
+            "jobTopic": ", ".join(skills),
+            "duration": DURATIONS[i % len(DURATIONS)],
+            "type": TYPES[i % len(TYPES)],
+            "company": f"Company {i % max(n // 5, 1)}",
+            "stipend": STIPENDS[i % len(STIPENDS)],
+            "jobType": JOB_TYPES[i % len(JOB_TYPES)],
+            "lastDate": (today + timedelta(days=int(i % 90) - 30)).strftime("%d-%m-%Y"),
+            "description": f"Work on {' and '.join(skills)} as a {title.lower()} with our team.",
+            "jobRole": title,
+            "skills": skills,
+            "numOfQns": int(2 + i % 4),
+            "locationName": city,
+            "location": {"type": "Point", "coordinates": [lon + (i % 7) * 0.01, lat]},
+        }
+        doc.update(typed_fields(doc))
+        doc["skillIds"] = skill_service.skill_vocabulary.posting_ids(posting_skills(doc))
+        docs.append(doc)
+
+    return docs, matrix
+
+
+def synthetic_resumes(rng, centroids, n):
+    topic_names = list(TOPICS)
+    topic_ids = rng.integers(0, len(topic_names), n)
+    matrix = clustered_vectors(rng, centroids, topic_ids)
+
+    docs = []
+    for i, t in enumerate(topic_ids):
+        topic = TOPICS[topic_names[t]]
+        skills = list(rng.choice(topic["skills"], 4, replace=False))
+        docs.append({
+            "_id": ObjectId(),
+            "userId": ObjectId(),
+            "updatedAt": f"2025-01-{1 + i % 28:02d}",
+            "resumeReview": f"Student with {topic['summary']} using {', '.join(skills)}.",
+            "resumeJSONdata": {
+                "skills": [{"name": "Skills", "items": skills}],
+                "experience": [{"role": topic["titles"][i % len(topic["titles"])], "organization": f"Org {i}",
+                                "responsibilities": [f"Worked on {skills[0]} and {skills[1]}"]}],
+                "projects": [{"name": f"Project {i}", "description": f"Built with {skills[2]}", "skills_used": skills[:2]}],
+                "education": [{"degree": "B.Tech", "field_of_study": topic_names[t], "institution": "University"}],
+            },
+        })
+
+    return docs, matrix, topic_ids
+
+
+class StandinCollection:
+    """Enough of a Mongo collection for the eligibility path: find_one by
+    _id and an exact $vectorSearch followed by $project."""
+
+    def __init__(self, docs, matrix):
+        self.docs = docs
+        self.matrix = matrix
+        self.by_id = {doc["_id"]: i for i, doc in enumerate(docs)}
+
+    def find_one(self, query, projection=None):
+        i = self.by_id.get(query.get("_id"))
+        if i is None:
+            return None
+        return dict(self.docs[i], embedding=self.matrix[i].tolist())
+
+    def aggregate(self, pipeline):
+        search = pipeline[0]["$vectorSearch"]
+        project = pipeline[1]["$project"] if len(pipeline) > 1 else {}
+
+        query = np.asarray(search["queryVector"], dtype=np.float32)
+        similarities = self.matrix @ query
+        limit = min(search["limit"], len(self.docs))
+        top = np.argpartition(-similarities, limit - 1)[:limit]
+        top = top[np.argsort(-similarities[top])]
+
+        fields = [k for k, v in project.items() if v == 1]
+        results = []
+        for i in top:
+            doc = {k: self.docs[i][k] for k in fields if k in self.docs[i]}
+            if "embedding" in fields:
+                doc["embedding"] = self.matrix[i].tolist()
+            if "vectorScore" in project:
+                doc["vectorScore"] = float((1 + similarities[i]) / 2)
+            results.append(doc)
+
+        return iter(results)
+
+
+def standin_rerank(query, documents):
+    """Lexical-overlap scorer with the Jina response shape."""
+    if RERANK_MS:
+        time.sleep(RERANK_MS / 1000)
+
+    query_terms = term_set(query)
+    results = [
+        {"index": i, "relevance_score": len(query_terms & term_set(doc)) / (len(query_terms) or 1)}
+        for i, doc in enumerate(documents)
+    ]
+    results.sort(key=lambda r: r["relevance_score"], reverse=True)
+    return results
+
+
+def standin_encoder(texts):
+    """Deterministic pseudo-embeddings seeded by a hash of each text."""
+    if EMBED_MS:
+        time.sleep(EMBED_MS / 1000)
+
+    vectors = []
+    for text in texts:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+        vectors.append((vector / np.linalg.norm(vector)).tolist())
+    return vectors
+
+
+def install_standins():
+    Config.LOCAL_INDEX_REFRESH_SECONDS = 10 ** 9
+    Config.LOCATION_TABLE_REFRESH_SECONDS = 10 ** 9
+    Config.RERANKER_BACKEND = "jina"
+
+    if not KEEP_CACHES:
+        Config.RESULT_CACHE_ENABLED = False
+        Config.RERANK_CACHE_ENABLED = False
+
+    reranker_service.rerank_jina = standin_rerank
+
+    embedding_service.dispatcher = EmbeddingDispatcher(
+        standin_encoder,
+        Config.EMBED_MAX_BATCH_SIZE,
+        Config.EMBED_MAX_WAIT_MS,
+        name="standin",
+        workers=Config.EMBED_WORKERS
+    )
+
+    # every synthetic skill is known, so embed_job never writes new ones
+    skill_service.skill_vocabulary = SkillVocabulary(
+        skill for topic in TOPICS.values() for skill in topic["skills"]
+    )
+
+    lookup = CityLookup(None)
+    lookup.table = {city: [[lon, lat]] for city, (lat, lon) in CITIES.items()}
+    lookup.loaded_at = time.time()
+    location_service.city_lookup = lookup
+
+
+def install_categories(docs, matrix):
+    """Fits categories on the corpus and tags every posting, as ingest does."""
+    model = CategoryModel(fit_centroids(matrix[:20000], len(TOPICS)))
+    for doc, category in zip(docs, nearest_categories(model.centroids, matrix)[:, 0]):
+        doc["categoryId"] = int(category)
+
+    category_service.category_model = model
+    category_service._loaded = True
+
+
+def install_index(docs, matrix):
+    index = LocalVectorIndex(None)
+    index.matrix = matrix
+    index.docs = docs
+    index.columns = build_columns(docs)
+    index.loaded_at = time.time()
+    index.dirty = False
+    local_index_service.local_index = index
+
+
+def timed(fn, payloads):
+    """Runs fn over payloads on CONCURRENCY threads; per-call latencies in ms
+    and throughput in calls per second."""
+    def call(payload):
+        start = time.perf_counter()
+        fn(payload)
+        return (time.perf_counter() - start) * 1000
+
+    # the services print progress lines per call; keep them out of the report
+    with redirect_stdout(io.StringIO()):
+        for payload in payloads[:min(5, len(payloads))]:
+            result = fn(payload)
+            if isinstance(result, tuple):
+                raise RuntimeError(f"{fn.__name__} failed: {result[0]}")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            latencies = np.array(list(executor.map(call, payloads)))
+        wall = time.perf_counter() - start
+
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "throughput_rps": len(payloads) / wall,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def recommend_payloads(rng, centroids):
+    topic_names = list(TOPICS)
+    topic_ids = rng.integers(0, len(topic_names), NUM_REQUESTS)
+    vectors = clustered_vectors(rng, centroids, topic_ids)
+
+    return [
+        {
+            "embedding": vectors[i].tolist(),
+            "resumeSummary": TOPICS[topic_names[t]]["summary"],
+            "filters": FILTER_TEMPLATES[i % len(FILTER_TEMPLATES)],
+            "backend": "local",
+        }
+        for i, t in enumerate(topic_ids)
+    ]
+
+
+def main():
+    rng = np.random.default_rng(42)
+    centroids = topic_centroids(rng)
+    install_standins()
+
+    results = {}
+
+    for size in SIZES:
+        start = time.perf_counter()
+        docs, matrix = synthetic_internships(rng, centroids, size)
+        install_categories(docs, matrix)
+        install_index(docs, matrix)
+        build_seconds = time.perf_counter() - start
+
+        row = timed(recommendation_service.recommend, recommend_payloads(rng, centroids))
+        row.update(
+            corpus=size,
+            build_s=build_seconds,
+            index_mb=matrix.nbytes / 2 ** 20
+        )
+        results[f"recommend@{size}"] = row
+
+        # the eligibility scenario ranks resumes for postings from this corpus
+        if size == SIZES[0]:
+            resumes, resume_matrix, _ = synthetic_resumes(rng, centroids, NUM_RESUMES)
+            internships = StandinCollection(docs, matrix)
+            standin_db = {
+                "new_internships_data": internships,
+                "resumedatas": StandinCollection(resumes, resume_matrix),
+            }
+            eligibility_service.get_db = lambda: standin_db
+
+            picks = rng.integers(0, len(docs), NUM_REQUESTS)
+            row = timed(eligibility_service.eligible_users, [{"internshipId": str(docs[i]["_id"])} for i in picks])
+            row["resumes"] = NUM_RESUMES
+            results["eligible_users"] = row
+
+            jobs = [dict(docs[i], _id=str(docs[i]["_id"]), location=None) for i in picks]
+            row = timed(embedding_service.embed_job, jobs)
+            row["mean_batch_size"] = embedding_service.dispatcher.stats()["mean_batch_size"]
+            results["embed_job"] = row
+
+        del docs, matrix
+        local_index_service.local_index = None
+
+    print(f"{'scenario':24s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'req/s':>9s} {'peak MB':>9s}")
+    for name, row in results.items():
+        print(
+            f"{name:24s} {row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['p99_ms']:9.2f} "
+            f"{row['throughput_rps']:9.1f} {row['peak_rss_mb']:9.0f}"
+        )
+
+    if OUTPUT:
+        with open(OUTPUT, "w") as f:
+            json.dump({"dim": DIM, "concurrency": CONCURRENCY, "results": results}, f, indent=2)
+
+    if BASELINE:
+        with open(BASELINE) as f:
+            baseline = json.load(f)["results"]
+
+        regressions = []
+        for name, row in results.items():
+            if name in baseline:
+                change = row["p95_ms"] / baseline[name]["p95_ms"] - 1
+                print(f"{name:24s} p95 {change:+.0%} vs baseline")
+                if change > TOLERANCE:
+                    regressions.append(name)
+
+        if regressions:
+            print("p95 regressions:", ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
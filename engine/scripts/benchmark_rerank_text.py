@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongo import get_db
+from config.config import Config
+from services.reranker_service import rerank_scores
+from services.eligibility_service import (
+    build_resume_pipeline,
+    keyword_filter,
+    rerank_documents,
+    INTERNSHIP_PROJECTION,
+)
+
+NUM_QUERIES = int(os.getenv("NUM_QUERIES", "10"))
+TOP_K = 10
+
+
+def load_tokenizer():
+    """Cross-encoder tokenizer when transformers is installed, else None
+    (token counts then fall back to whitespace words)."""
+    try:
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(Config.CROSS_ENCODER_MODEL)
+    except Exception:
+        return None
+
+
+def count_tokens(tokenizer, text):
+    if tokenizer is None:
+        return len(text.split())
+    return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+
+def legacy_documents(resumes):
+    return [str(r.get("resumeJSONdata", "")) for r in resumes]
+
+
+def main():
+    db = get_db()
+    tokenizer = load_tokenizer()
+
+    stats = {
+        name: {"bytes": [], "tokens": [], "truncated": [], "latency": []}
+        for name in ("legacy", "compact")
+    }
+    overlap = []
+
+    internships = db["new_internships_data"].find(
+        {"embedding": {"$exists": True}}, INTERNSHIP_PROJECTION
+    ).limit(NUM_QUERIES)
+
+    for internship in internships:
+        resumes = list(db["resumedatas"].aggregate(build_resume_pipeline(internship["embedding"])))
+        resumes = keyword_filter(internship, resumes)
+        if not resumes:
+            continue
+
+        query = internship.get("description", "Internship posting")
+        scores = {}
+
+        for name, documents in (("legacy", legacy_documents(resumes)), ("compact", rerank_documents(resumes))):
+            tokens = [count_tokens(tokenizer, d) for d in documents]
+
+            stats[name]["bytes"].append(sum(len(d.encode("utf-8")) for d in documents))
+            stats[name]["tokens"].extend(tokens)
+            stats[name]["truncated"].extend(t > Config.RERANK_MAX_LENGTH for t in tokens)
+
+            start = time.perf_counter()
+            scores[name] = rerank_scores(query=query, documents=documents, use_cache=False)
+            stats[name]["latency"].append(time.perf_counter() - start)
+
+        top_legacy = set(np.argsort(-np.asarray(scores["legacy"]))[:TOP_K])
+        top_compact = set(np.argsort(-np.asarray(scores["compact"]))[:TOP_K])
+        overlap.append(len(top_legacy & top_compact) / max(len(top_legacy), 1))
+
+    if not overlap:
+        print("No internships with candidate resumes found.")
+        return
+
+    unit = "tokens" if tokenizer else "words"
+    print(f"Rerank payloads over {len(overlap)} internships ({unit} counted with {'tokenizer' if tokenizer else 'whitespace'})")
+
+    for name, s in stats.items():
+        ms = np.array(s["latency"]) * 1000
+        print(
+            f"{name:8s} payload={np.mean(s['bytes']) / 1024:.1f}KB/request "
+            f"mean {unit}={np.mean(s['tokens']):.0f}/doc "
+            f"over {Config.RERANK_MAX_LENGTH}={100 * np.mean(s['truncated']):.0f}% "
+            f"latency p50={np.percentile(ms, 50):.1f}ms p95={np.percentile(ms, 95):.1f}ms"
+        )
+
+    print(f"top-{TOP_K} overlap between representations: {np.mean(overlap):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongo import get_collection
+from services.category_service import MODEL_ID, category_collection, classify_collection, fit_category_model
+
+CATEGORY_COUNT = int(os.getenv("CATEGORY_COUNT", "24"))
+CATEGORY_SAMPLE_SIZE = int(os.getenv("CATEGORY_SAMPLE_SIZE", "20000"))
+
+
+def main():
+    """Fits the internship categories on the stored embeddings and writes
+    categoryId and categoryVersion on every posting. Engines reload the
+    model when they meet a posting with the new version; /refresh_index
+    reloads it at once."""
+    internships = get_collection()
+
+    model = fit_category_model(internships, CATEGORY_COUNT, CATEGORY_SAMPLE_SIZE)
+    if model is None:
+        raise RuntimeError("No internship embeddings to fit categories on.")
+
+    category_collection().replace_one({"_id": MODEL_ID}, model.to_document(), upsert=True)
+    print(f"Fitted {len(model.labels)} categories: {', '.join(model.labels)}")
+
+    total = classify_collection(internships, model)
+    print(f"Wrote categoryId for {total} internships (model version {model.version}).")
+    print("POST /refresh_index on every engine instance to load the new categories.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongo import get_db
+from config.config import Config
+from services.eligibility_service import compute_eligibility, INTERNSHIP_PROJECTION
+from services.eligibility_matrix_service import get_eligibility_matrix, build_row, is_fresh, now
+
+WORKERS = int(os.getenv("MATRIX_WORKERS", str(Config.ELIGIBILITY_WORKERS)))
+BATCH_SIZE = int(os.getenv("MATRIX_BATCH_SIZE", "20"))
+ONLY_STALE = os.getenv("ONLY_STALE", "false").lower() == "true"
+VERIFY_SAMPLE = int(os.getenv("VERIFY_SAMPLE", "0"))
+
+
+def compute_row(db, internship):
+    computed_at = now()
+    result = compute_eligibility(db, internship)
+    return build_row(internship["_id"], result, computed_at)
+
+
+def verify(db, matrix, internships):
+    """Recomputes a sample of rows the way /eligible_users does live and
+    checks that the stored scores match exactly."""
+    mismatches = 0
+
+    for internship in internships[:VERIFY_SAMPLE]:
+        stored = matrix.get(internship["_id"])
+        live = build_row(internship["_id"], compute_eligibility(db, internship))
+
+        for key in ("eligible_users", "all_ranked_results"):
+            if stored is None or stored[key] != live[key]:
+                mismatches += 1
+                print(f"Mismatch in {key} for internship {internship['_id']}")
+                break
+
+    print(f"Verified {min(VERIFY_SAMPLE, len(internships))} rows, {mismatches} mismatches.")
+
+
+def main():
+    db = get_db()
+    matrix = get_eligibility_matrix()
+    matrix.ensure_indexes()
+
+    internships = list(db["new_internships_data"].find(
+        {"embedding": {"$exists": True}},
+        INTERNSHIP_PROJECTION
+    ))
+
+    if ONLY_STALE:
+        internships = [i for i in internships if not is_fresh(matrix.get(i["_id"]))]
+
+    print(f"Computing eligibility for {len(internships)} internships with {WORKERS} workers...")
+
+    start = time.perf_counter()
+    done = failed = 0
+    rows = []
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        futures = {executor.submit(compute_row, db, internship): internship["_id"] for internship in internships}
+
+        for future in as_completed(futures):
+            try:
+                rows.append(future.result())
+                done += 1
+            except Exception as e:
+                failed += 1
+                print(f"Failed for internship {futures[future]}:", e)
+
+            if len(rows) >= BATCH_SIZE:
+                matrix.store_many(rows)
+                rows = []
+                print(f"  {done}/{len(internships)} rows written")
+
+    matrix.store_many(rows)
+
+    elapsed = time.perf_counter() - start
+    print(f"Done: {done} rows, {failed} failures in {elapsed:.1f}s")
+
+    if VERIFY_SAMPLE:
+        verify(db, matrix, internships)
+
+
+if __name__ == "__main__":
+    main()
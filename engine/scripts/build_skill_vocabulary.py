@@ -0,0 +1,44 @@
+import os
+import sys
+from pymongo import UpdateOne
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongo import get_collection
+from services.skill_service import VOCABULARY_ID, vocabulary_collection
+from utils.skills import SkillVocabulary, posting_skills
+
+BATCH_SIZE = 500
+
+
+def main():
+    """Rebuilds the skill vocabulary from the stored internships and writes
+    skillIds on every posting. Aliases kept in the stored vocabulary are
+    applied, so rerun this after editing them."""
+    internships = get_collection()
+    stored = vocabulary_collection().find_one({"_id": VOCABULARY_ID}) or {}
+    vocabulary = SkillVocabulary(aliases=stored.get("aliases"))
+
+    updates = []
+    total = 0
+
+    for doc in internships.find({}, {"skills": 1}):
+        ids = vocabulary.posting_ids(posting_skills(doc))
+        updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"skillIds": ids}}))
+
+        if len(updates) >= BATCH_SIZE:
+            internships.bulk_write(updates, ordered=False)
+            total += len(updates)
+            updates = []
+
+    if updates:
+        internships.bulk_write(updates, ordered=False)
+        total += len(updates)
+
+    vocabulary_collection().replace_one({"_id": VOCABULARY_ID}, vocabulary.to_document(), upsert=True)
+
+    print(f"Wrote skillIds for {total} internships; vocabulary has {len(vocabulary.skills)} skills.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import random
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongo import get_collection, get_db
+from services.local_index_service import get_local_index
+
+NUM_QUERIES = int(os.getenv("NUM_QUERIES", "50"))
+LIMIT = 200
+TOP_K = 10
+
+random.seed(42)
+
+
+def atlas_search(collection, query_vector, limit):
+    pipeline = [
+        {
+            "$vectorSearch": {
+                "index": "vector_index",
+                "path": "embedding",
+                "queryVector": query_vector,
+                "numCandidates": 500,
+                "limit": limit
+            }
+        },
+        {"$project": {"_id": 1, "score": {"$meta": "vectorSearchScore"}}}
+    ]
+    return list(collection.aggregate(pipeline))
+
+
+def load_queries():
+    """Resume embeddings are the real /recommend queries; fall back to
+    internship embeddings when no resumes are stored yet."""
+    resumes = get_db()["resumedatas"]
+    queries = [r["embedding"] for r in resumes.find({}, {"embedding": 1}).limit(NUM_QUERIES) if r.get("embedding")]
+
+    if len(queries) < NUM_QUERIES:
+        sample = get_collection().aggregate([
+            {"$sample": {"size": NUM_QUERIES - len(queries)}},
+            {"$project": {"embedding": 1}}
+        ])
+        queries.extend(d["embedding"] for d in sample if d.get("embedding"))
+
+    return queries
+
+
+def percentile_ms(values, q):
+    return float(np.percentile(values, q)) * 1000
+
+
+def main():
+    collection = get_collection()
+    index = get_local_index()
+    queries = load_queries()
+
+    print(f"Comparing backends on {len(queries)} queries (local index: {len(index.docs)} docs)")
+
+    atlas_times, local_times = [], []
+    recall_at_k, recall_at_limit = [], []
+
+    for query in queries:
+        start = time.perf_counter()
+        atlas = atlas_search(collection, query, LIMIT)
+        atlas_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        local = index.search(query, limit=LIMIT)
+        local_times.append(time.perf_counter() - start)
+
+        atlas_ids = [str(d["_id"]) for d in atlas]
+        local_ids = [str(d["_id"]) for d in local]
+
+        # Local search is exact, so it is the ground truth Atlas ANN is measured against
+        if local_ids:
+            recall_at_k.append(len(set(atlas_ids[:TOP_K]) & set(local_ids[:TOP_K])) / min(TOP_K, len(local_ids)))
+            recall_at_limit.append(len(set(atlas_ids) & set(local_ids)) / len(local_ids))
+
+    print(f"Atlas  latency p50={percentile_ms(atlas_times, 50):.1f}ms p95={percentile_ms(atlas_times, 95):.1f}ms")
+    print(f"Local  latency p50={percentile_ms(local_times, 50):.1f}ms p95={percentile_ms(local_times, 95):.1f}ms")
+    print(f"Atlas recall@{TOP_K} vs exact: {np.mean(recall_at_k):.3f}")
+    print(f"Atlas recall@{LIMIT} vs exact: {np.mean(recall_at_limit):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongo import get_collection, get_db
+from services.reranker_service import rerank_scores
+
+NUM_QUERIES = int(os.getenv("NUM_QUERIES", "20"))
+DOCS_PER_QUERY = int(os.getenv("DOCS_PER_QUERY", "50"))
+TOP_K = 10
+
+# Optional JSONL with {"query", "documents", "labels"} rows for graded relevance
+LABELS_FILE = os.getenv("LABELS_FILE")
+
+
+def ndcg_at_k(scores, gains, k=TOP_K):
+    gains = np.maximum(np.asarray(gains, dtype=float), 0)
+    order = np.argsort(-np.asarray(scores), kind="stable")[:k]
+    discounts = 1 / np.log2(np.arange(2, len(order) + 2))
+
+    dcg = float(np.sum(gains[order] * discounts))
+    ideal = float(np.sum(np.sort(gains)[::-1][:k] * discounts))
+    return dcg / ideal if ideal else 0.0
+
+
+def load_labelled_cases():
+    with open(LABELS_FILE) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_live_cases():
+    """The same (resume summary, internship texts) pairs /recommend sends to the reranker."""
+    collection = get_collection()
+    cases = []
+
+    for resume in get_db()["resumedatas"].find({}, {"resumeReview": 1, "embedding": 1}).limit(NUM_QUERIES):
+        if not resume.get("embedding") or not resume.get("resumeReview"):
+            continue
+
+        candidates = collection.aggregate([
+            {
+                "$vectorSearch": {
+                    "index": "vector_index",
+                    "path": "embedding",
+                    "queryVector": resume["embedding"],
+                    "numCandidates": 500,
+                    "limit": DOCS_PER_QUERY
+                }
+            },
+            {"$project": {"jobTitle": 1, "jobRole": 1, "jobTopic": 1, "description": 1}}
+        ])
+
+        documents = [
+            f"{c.get('jobTitle','')} {c.get('jobRole','')} {c.get('jobTopic','')} {c.get('description','')}"
+            for c in candidates
+        ]
+        if documents:
+            cases.append({"query": resume["resumeReview"].lower(), "documents": documents})
+
+    return cases
+
+
+def main():
+    cases = load_labelled_cases() if LABELS_FILE else load_live_cases()
+    print(f"Comparing rerankers on {len(cases)} queries")
+
+    latencies = {"jina": [], "local": []}
+    ndcg = {"jina": [], "local": []}
+    agreement = []
+
+    for case in cases:
+        scores = {}
+        for backend in ("jina", "local"):
+            start = time.perf_counter()
+            scores[backend] = rerank_scores(case["query"], case["documents"], backend=backend, use_cache=False)
+            latencies[backend].append(time.perf_counter() - start)
+
+        if "labels" in case:
+            for backend in ("jina", "local"):
+                ndcg[backend].append(ndcg_at_k(scores[backend], case["labels"]))
+
+        # Without labels, Jina's scores serve as the graded reference
+        agreement.append(ndcg_at_k(scores["local"], scores["jina"]))
+
+    for backend in ("jina", "local"):
+        ms = np.array(latencies[backend]) * 1000
+        line = f"{backend:6s} latency p50={np.percentile(ms, 50):.1f}ms p95={np.percentile(ms, 95):.1f}ms"
+        if ndcg[backend]:
+            line += f" NDCG@{TOP_K}={np.mean(ndcg[backend]):.3f}"
+        print(line)
+
+    print(f"local NDCG@{TOP_K} against Jina scores: {np.mean(agreement):.3f}")
+
+
+if __name__ == "__main__":
+    main()
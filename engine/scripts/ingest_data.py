@@ -1,14 +1,23 @@
 import os
-import re
+import sys
+import time
 import random
 import pandas as pd
 from tqdm import tqdm
 from dotenv import load_dotenv
 from pymongo import MongoClient
+from pymongo.operations import SearchIndexModel
 from sentence_transformers import SentenceTransformer
 import torch
 
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.filters import typed_fields, vector_index_definition
+from utils.skills import SkillVocabulary, posting_skills
+from utils.categories import nearest_categories
+from services.category_service import CategoryModel, classify_collection, fit_category_model
+
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
@@ -18,29 +27,62 @@ COLLECTION_NAME = os.getenv("COLLECTION_NAME")
 MODEL_NAME = "BAAI/bge-large-en-v1.5"
 CSV_FILE_PATH = "../data/Internship_dataset.csv"
 
+CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "2000"))
+ENCODE_BATCH_SIZE = int(os.getenv("INGEST_ENCODE_BATCH_SIZE", "32"))
+STAGING_SUFFIX = "_staging"
+SEARCH_INDEX_TIMEOUT_SECONDS = int(os.getenv("SEARCH_INDEX_TIMEOUT_SECONDS", "900"))
+SKILL_VOCABULARY_COLLECTION = os.getenv("SKILL_VOCABULARY_COLLECTION", "skill_vocabulary")
+CATEGORY_COLLECTION = os.getenv("CATEGORY_COLLECTION", "categories")
+CATEGORY_COUNT = int(os.getenv("CATEGORY_COUNT", "24"))
+CATEGORY_SAMPLE_SIZE = int(os.getenv("CATEGORY_SAMPLE_SIZE", "20000"))
+CATEGORY_REFIT = os.getenv("CATEGORY_REFIT", "false").lower() == "true"
+
+# Always built with the current filter fields; other search indexes are copied as-is
+DEFAULT_VECTOR_INDEX = {
+    "name": "vector_index",
+    "type": "vectorSearch",
+    "definition": vector_index_definition()
+}
+
 random.seed(42)
 
-def clean_text(text: str) -> str:
-    """Cleans and normalizes text for better embeddings."""
-    if not isinstance(text, str):
-        return ""
-    text = text.lower().strip()
-    text = re.sub(r"\s+", " ", text)
-    text = re.sub(r"[^a-z0-9.,;:!?()\- ]", "", text)
-    return text
-
-def build_combined_text(row: pd.Series) -> str:
-    """Builds a semantically rich internship representation with weighted fields."""
-    parts = []
-    if row.get("Job Title"):
-        parts.append(("Internship Title: " + clean_text(row["Job Title"]) + ". ") * 2)
-    if row.get("Job Role"):
-        parts.append((f"Role: {clean_text(row['Job Role'])}. ") * 1)
-    if row.get("Job Topics"):
-        parts.append((f"Topic: {clean_text(row['Job Topics'])}. ") * 3)
-    if row.get("Job Description"):
-        parts.append((f"Responsibilities include: {clean_text(row['Job Description'])}. ") * 3)
-    return " ".join(parts).strip()
+def clean_series(values: pd.Series) -> pd.Series:
+    """Cleans and normalizes a text column for better embeddings."""
+    text = values.where(values.map(lambda v: isinstance(v, str)), "").astype(str)
+    return (
+        text.str.lower()
+        .str.strip()
+        .str.replace(r"\s+", " ", regex=True)
+        .str.replace(r"[^a-z0-9.,;:!?()\- ]", "", regex=True)
+    )
+
+def weighted_part(chunk: pd.DataFrame, column: str, prefix: str, repeat: int) -> pd.Series:
+    """`prefix + cleaned value + ". "` repeated `repeat` times, or "" where
+    the raw cell is falsy (an empty string) or the column is missing."""
+    if column not in chunk:
+        return pd.Series("", index=chunk.index)
+
+    raw = chunk[column]
+    part = (prefix + clean_series(raw) + ". ") * repeat
+    return part.where(raw.map(bool), "")
+
+def build_combined_texts(chunk: pd.DataFrame) -> pd.Series:
+    """Builds a semantically rich internship representation with weighted
+    fields for every row of a CSV chunk at once."""
+    parts = [
+        weighted_part(chunk, "Job Title", "Internship Title: ", 2),
+        weighted_part(chunk, "Job Role", "Role: ", 1),
+        weighted_part(chunk, "Job Topics", "Topic: ", 3),
+        weighted_part(chunk, "Job Description", "Responsibilities include: ", 3),
+    ]
+
+    # " ".join over the non-empty parts, as the per-row builder did
+    combined = pd.Series("", index=chunk.index)
+    for part in parts:
+        separator = pd.Series(" ", index=chunk.index).where((combined != "") & (part != ""), "")
+        combined = combined + separator + part
+
+    return combined.str.strip()
 
 def connect_mongo():
     """Connect to MongoDB Atlas with validation."""
@@ -72,14 +114,12 @@ def load_model():
     except Exception as e:
         raise RuntimeError(f"Error loading model: {e}")
 
-def process_csv():
-    """Load and preprocess internship dataset."""
+def read_chunks():
+    """Streams the internship dataset in CHUNK_SIZE-row DataFrames."""
     if not os.path.exists(CSV_FILE_PATH):
         raise FileNotFoundError(f"File not found: {CSV_FILE_PATH}")
-    print(f"Loading dataset: {CSV_FILE_PATH} ...")
-    df = pd.read_csv(CSV_FILE_PATH)
-    print(f"Loaded {len(df)} internships from CSV.")
-    return df
+    print(f"Streaming dataset: {CSV_FILE_PATH} in chunks of {CHUNK_SIZE} rows ...")
+    return pd.read_csv(CSV_FILE_PATH, chunksize=CHUNK_SIZE)
 
 def parse_coordinates(coord_str: str):
     """Parses 'lat,lon' string and returns GeoJSON Point [lon, lat]."""
@@ -89,34 +129,15 @@ def parse_coordinates(coord_str: str):
         lat, lon = map(float, coord_str.split(","))
         return {
             "type": "Point",
-            "coordinates": [lon, lat]  
+            "coordinates": [lon, lat]
         }
     except Exception:
         return None
 
-def main():
-    client = connect_mongo()
-    db = client[DB_NAME]
-    collection = db[COLLECTION_NAME]
-
-    model = load_model()
-    df = process_csv()
-
-    print(f"Clearing existing data in collection '{COLLECTION_NAME}' ...")
-    collection.delete_many({})
-
-    internship_texts, internship_metadata = [], []
-
-    print("Preparing internship texts ...")
-    for _, row in tqdm(df.iterrows(), total=len(df)):
-        combined_text = build_combined_text(row)
-        if not combined_text:
-            continue
-
-        coord_geojson = parse_coordinates(row.get("Coordinates"))
-
-        internship_texts.append(combined_text)
-        internship_metadata.append({
+def build_documents(chunk: pd.DataFrame, vocabulary: SkillVocabulary):
+    documents = []
+    for row in chunk.to_dict("records"):
+        meta = {
             "jobTitle": row.get("Job Title"),
             "jobTopic": row.get("Job Topics"),
             "duration": row.get("Duration"),
@@ -129,33 +150,146 @@ def main():
             "jobRole": row.get("Job Role"),
             "numOfQns": random.randint(2, 5),
             "locationName": row.get("Location"),
-            "location": coord_geojson
-        })
+            "location": parse_coordinates(row.get("Coordinates"))
+        }
+        meta.update(typed_fields(meta))
+        meta["skillIds"] = vocabulary.posting_ids(posting_skills(meta))
+        documents.append(meta)
+    return documents
+
+def ingest_chunk(model, staging, vocabulary, categories, chunk: pd.DataFrame) -> int:
+    """Builds, encodes and writes one chunk; nothing is kept afterwards, so
+    memory stays flat whatever the file size."""
+    texts = build_combined_texts(chunk)
+    keep = texts != ""
+    chunk, texts = chunk[keep], texts[keep]
+    if chunk.empty:
+        return 0
 
-    print("Generating embeddings in batches ...")
     embeddings = model.encode(
-        internship_texts,
-        batch_size=32,
+        texts.tolist(),
+        batch_size=ENCODE_BATCH_SIZE,
         convert_to_numpy=True,
         normalize_embeddings=True,
-        show_progress_bar=True
+        show_progress_bar=False
     )
 
-    print(f"Inserting {len(internship_metadata)} documents into MongoDB ...")
-    for meta, emb in zip(internship_metadata, embeddings):
+    documents = build_documents(chunk, vocabulary)
+    for meta, emb in zip(documents, embeddings):
         meta["embedding"] = emb.tolist()
 
+    # with known centroids postings are classified as they stream in
+    if categories is not None:
+        for meta, category in zip(documents, nearest_categories(categories.centroids, embeddings)[:, 0]):
+            meta["categoryId"] = int(category)
+            meta["categoryVersion"] = categories.version
+
+    staging.insert_many(documents, ordered=False)
+    return len(documents)
+
+def search_index_models(collection):
+    """Search index definitions of the live collection, so the staging copy
+    is served by identical indexes after the swap. vector_index always gets
+    the current definition with its filter fields."""
     try:
-        collection.insert_many(internship_metadata, ordered=False)
-        print(f"Data insertion complete! Total docs: {collection.count_documents({})}")
+        existing = list(collection.list_search_indexes())
     except Exception as e:
-        print(f"Error during insertion: {e}")
+        print(f"Could not list search indexes ({e}); using the default vector index.")
+        existing = []
+
+    definitions = [DEFAULT_VECTOR_INDEX] + [
+        {"name": idx["name"], "type": idx.get("type", "search"), "definition": idx["latestDefinition"]}
+        for idx in existing
+        if idx.get("latestDefinition") and idx["name"] != DEFAULT_VECTOR_INDEX["name"]
+    ]
+
+    return [SearchIndexModel(**d) for d in definitions]
+
+def wait_until_queryable(collection, names):
+    deadline = time.time() + SEARCH_INDEX_TIMEOUT_SECONDS
+    while time.time() < deadline:
+        ready = {idx["name"] for idx in collection.list_search_indexes() if idx.get("queryable")}
+        if set(names) <= ready:
+            return
+        time.sleep(5)
+    raise RuntimeError(f"Search indexes {names} not queryable after {SEARCH_INDEX_TIMEOUT_SECONDS}s")
+
+def main():
+    client = connect_mongo()
+    db = client[DB_NAME]
+    collection = db[COLLECTION_NAME]
+
+    staging_name = COLLECTION_NAME + STAGING_SUFFIX
+    staging = db[staging_name]
+
+    model = load_model()
 
-    collection.create_index([("location", "2dsphere")])
+    print(f"Writing into staging collection '{staging_name}'; '{COLLECTION_NAME}' keeps serving meanwhile.")
+    staging.drop()
+
+    # hand-maintained aliases are kept; the skill list is rebuilt from the new data
+    stored = db[SKILL_VOCABULARY_COLLECTION].find_one({"_id": "internships"}) or {}
+    vocabulary = SkillVocabulary(aliases=stored.get("aliases"))
+
+    # category ids stay stable across ingests unless CATEGORY_REFIT is set
+    categories = None
+    if not CATEGORY_REFIT:
+        categories = CategoryModel.from_document(db[CATEGORY_COLLECTION].find_one({"_id": "internships"}))
+        if categories is not None and categories.centroids.shape[1] != model.get_sentence_embedding_dimension():
+            categories = None
+
+    total = 0
+    with tqdm(unit="docs") as progress:
+        for chunk in read_chunks():
+            written = ingest_chunk(model, staging, vocabulary, categories, chunk)
+            total += written
+            progress.update(written)
+
+    if total == 0:
+        staging.drop()
+        raise RuntimeError("No internships ingested; the live collection was left untouched.")
+
+    print(f"Staged {total} documents.")
+
+    refit = categories is None
+    if refit:
+        print(f"Fitting {CATEGORY_COUNT} categories on up to {CATEGORY_SAMPLE_SIZE} staged embeddings ...")
+        categories = fit_category_model(staging, CATEGORY_COUNT, CATEGORY_SAMPLE_SIZE)
+        classify_collection(staging, categories)
+        db[CATEGORY_COLLECTION].replace_one({"_id": "internships"}, categories.to_document(), upsert=True)
+        print(f"Categories: {', '.join(categories.labels)}")
+
+    staging.create_index([("location", "2dsphere")])
     print("2dsphere index created on 'location'.")
 
+    models = search_index_models(collection)
+    staging.create_search_indexes(models)
+    names = [m.document["name"] for m in models]
+    print(f"Building search indexes {names} on staging ...")
+    wait_until_queryable(staging, names)
+
+    # renameCollection with dropTarget replaces the live collection in one step
+    staging.rename(COLLECTION_NAME, dropTarget=True)
+    print(f"Swapped '{staging_name}' in as '{COLLECTION_NAME}' ({total} docs).")
+
+    db[SKILL_VOCABULARY_COLLECTION].replace_one({"_id": "internships"}, vocabulary.to_document(), upsert=True)
+    print(f"Stored a vocabulary of {len(vocabulary.skills)} skills.")
+
+    # Search indexes should follow the renamed collection; recreate any that did not
+    live = {idx["name"] for idx in collection.list_search_indexes()}
+    missing = [m for m in models if m.document["name"] not in live]
+    if missing:
+        print(f"Recreating search indexes {[m.document['name'] for m in missing]} on '{COLLECTION_NAME}' ...")
+        collection.create_search_indexes(missing)
+        wait_until_queryable(collection, [m.document["name"] for m in missing])
+
     client.close()
     print("MongoDB connection closed.")
 
+    if refit:
+        # running engines reload on the first request that sees the new
+        # categoryVersion; /refresh_index does it at once, for /embed too
+        print("Categories were refit: POST /refresh_index on every engine instance to load them.")
+
 if __name__ == "__main__":
     main()
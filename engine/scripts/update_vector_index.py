@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+from pymongo import UpdateOne
+from pymongo.operations import SearchIndexModel
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongo import get_collection
+from utils.filters import typed_fields, vector_index_definition
+
+BATCH_SIZE = 500
+INDEX_NAME = "vector_index"
+SEARCH_INDEX_TIMEOUT_SECONDS = int(os.getenv("SEARCH_INDEX_TIMEOUT_SECONDS", "900"))
+
+
+def backfill_typed_fields(collection):
+    """Writes the typed filter fields on internships stored before they
+    were added at ingest and by /embed."""
+    cursor = collection.find(
+        {"$or": [{"typeKey": {"$exists": False}}, {"lastDateDay": {"$exists": False}}]},
+        {"stipend": 1, "lastDate": 1, "type": 1, "jobType": 1}
+    )
+
+    updates = []
+    total = 0
+
+    for doc in cursor:
+        updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": typed_fields(doc)}))
+
+        if len(updates) >= BATCH_SIZE:
+            collection.bulk_write(updates, ordered=False)
+            total += len(updates)
+            updates = []
+
+    if updates:
+        collection.bulk_write(updates, ordered=False)
+        total += len(updates)
+
+    print(f"Backfilled typed filter fields for {total} internships.")
+
+
+def indexed_paths(index):
+    return {field.get("path") for field in (index.get("latestDefinition") or {}).get("fields", [])}
+
+
+def update_index(collection):
+    definition = vector_index_definition()
+    existing = {idx["name"] for idx in collection.list_search_indexes()}
+
+    if INDEX_NAME in existing:
+        collection.update_search_index(INDEX_NAME, definition)
+        print(f"Updated '{INDEX_NAME}' with filter fields.")
+    else:
+        collection.create_search_index(SearchIndexModel(definition=definition, name=INDEX_NAME, type="vectorSearch"))
+        print(f"Created '{INDEX_NAME}' with filter fields.")
+
+    # the old definition keeps serving until the rebuild is queryable
+    deadline = time.time() + SEARCH_INDEX_TIMEOUT_SECONDS
+    while time.time() < deadline:
+        index = next(iter(collection.list_search_indexes(INDEX_NAME)), {})
+        if index.get("status") == "READY" and indexed_paths(index) >= indexed_paths({"latestDefinition": definition}):
+            print(f"'{INDEX_NAME}' is ready; RECOMMEND_PREFILTER=true can be turned on.")
+            return
+        time.sleep(5)
+
+    raise RuntimeError(f"'{INDEX_NAME}' not ready after {SEARCH_INDEX_TIMEOUT_SECONDS}s")
+
+
+def main():
+    """Prepares an existing deployment for $vectorSearch pre-filtering."""
+    collection = get_collection()
+    backfill_typed_fields(collection)
+    update_index(collection)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import threading
+import numpy as np
+from config.config import Config
+
+
+def boundary_position(order, keys, top_k):
+    """Position in `order` of the candidate that fills the last of the
+    top_k distinct (company, jobRole) slots, or the last position."""
+    seen = set()
+
+    for position, i in enumerate(order):
+        seen.add(keys[i])
+        if len(seen) >= top_k:
+            return position
+
+    return len(order) - 1
+
+
+def rerank_depth(stage_one, keys, top_k):
+    """(candidate indices to rerank, early exit flag). Everything within
+    CASCADE_SCORE_MARGIN of the top_k-th stage-1 score is reranked, clamped
+    to [CASCADE_MIN_DEPTH, CASCADE_MAX_DEPTH]. When the gap below the
+    top_k-th candidate is at least CASCADE_DECISIVE_GAP the reranker cannot
+    change which results make the cut, so only those are reranked to order
+    them."""
+    order = np.argsort(-stage_one, kind="stable")
+
+    if not Config.RERANK_CASCADE or len(order) <= Config.CASCADE_MIN_DEPTH:
+        return order, False
+
+    boundary = boundary_position(order, keys, top_k)
+    sorted_scores = stage_one[order]
+
+    if boundary + 1 < len(order) and sorted_scores[boundary] - sorted_scores[boundary + 1] >= Config.CASCADE_DECISIVE_GAP:
+        return order[:boundary + 1], True
+
+    within_margin = int(np.count_nonzero(sorted_scores >= sorted_scores[boundary] - Config.CASCADE_SCORE_MARGIN))
+    depth = min(max(within_margin, Config.CASCADE_MIN_DEPTH), Config.CASCADE_MAX_DEPTH)
+
+    # the top_k distinct results are always reranked, however deep they sit
+    return order[:max(depth, boundary + 1)], False
+
+
+def fill_cross_scores(size, head, head_scores):
+    """Cross scores for every candidate; ones left out of the rerank get
+    the lowest head score, so they rank below reranked peers with the
+    same stage-1 score."""
+    head_scores = np.asarray(head_scores, dtype=float)
+    scores = np.full(size, head_scores.min() if len(head_scores) else 0.0)
+    scores[head] = head_scores
+    return scores
+
+
+class CascadeStats:
+    """How deep the cascade reranked and how often the cross-encoder
+    changed the final top 10 compared with stage-1 order."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.candidates = 0
+        self.reranked = 0
+        self.early_exits = 0
+        self.top_changed = 0
+        self.order_changed = 0
+
+    def record(self, candidates, reranked, early_exit, stage_one_top, final_top):
+        with self.lock:
+            self.requests += 1
+            self.candidates += candidates
+            self.reranked += reranked
+            self.early_exits += int(early_exit)
+            self.top_changed += int(set(stage_one_top) != set(final_top))
+            self.order_changed += int(stage_one_top != final_top)
+
+    def stats(self):
+        with self.lock:
+            requests = self.requests or 1
+            return {
+                "enabled": Config.RERANK_CASCADE,
+                "requests": self.requests,
+                "candidates": self.candidates,
+                "reranked": self.reranked,
+                "rerank_fraction": self.reranked / self.candidates if self.candidates else 0.0,
+                "early_exits": self.early_exits,
+                "top_changed": self.top_changed,
+                "top_changed_rate": self.top_changed / requests,
+                "order_changed": self.order_changed,
+                "order_changed_rate": self.order_changed / requests,
+            }
+
+
+cascade_stats = CascadeStats()
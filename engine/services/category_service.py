@@ -0,0 +1,158 @@
+import threading
+import time
+import numpy as np
+from pymongo import UpdateOne
+from config.config import Config
+from db.mongo import get_db
+from utils.categories import fit_centroids, nearest_categories, category_labels
+
+MODEL_ID = "internships"
+
+
+class CategoryModel:
+    """Nearest-centroid classifier over internship embeddings. Category ids
+    are centroid positions, so they are only comparable between postings
+    and users classified by the same `version` (the fit time)."""
+
+    def __init__(self, centroids, labels=None, version=0):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.labels = labels or [f"category {i}" for i in range(len(self.centroids))]
+        self.version = version
+
+    def classify(self, embedding):
+        return int(nearest_categories(self.centroids, [embedding])[0, 0])
+
+    def nearest(self, embedding, top):
+        return [int(i) for i in nearest_categories(self.centroids, [embedding], top=top)[0]]
+
+    def to_document(self):
+        return {"centroids": self.centroids.tolist(), "labels": self.labels, "version": self.version}
+
+    @classmethod
+    def from_document(cls, doc):
+        if not doc or not doc.get("centroids"):
+            return None
+        # models stored before versions existed are version 0
+        return cls(doc["centroids"], doc.get("labels"), doc.get("version", 0))
+
+
+category_model = None
+_loaded = False
+_reloaded_for = 0
+_init_lock = threading.Lock()
+
+
+def category_collection():
+    return get_db()[Config.CATEGORY_COLLECTION]
+
+
+def get_category_model():
+    """The centroids written by ingest_data.py / build_categories.py, or
+    None before the first fit."""
+    global category_model, _loaded
+
+    if not _loaded:
+        with _init_lock:
+            if not _loaded:
+                try:
+                    category_model = CategoryModel.from_document(
+                        category_collection().find_one({"_id": MODEL_ID})
+                    )
+                except Exception as e:
+                    print("Category model unavailable:", e)
+                    category_model = None
+                _loaded = True
+
+    return category_model
+
+
+def reload_category_model():
+    global _loaded
+
+    with _init_lock:
+        _loaded = False
+
+    return get_category_model()
+
+
+def category_fields(embedding):
+    """categoryId and categoryVersion of a new posting (for /embed)."""
+    model = get_category_model()
+    if model is None:
+        return {"categoryId": None, "categoryVersion": None}
+    return {"categoryId": model.classify(embedding), "categoryVersion": model.version}
+
+
+def posting_version(candidate):
+    return candidate.get("categoryVersion") or 0
+
+
+def current_category_model(candidates):
+    """The loaded model, reloaded first when a candidate was classified by
+    a newer fit (a refit swapped in by ingest_data.py / build_categories.py)."""
+    global _reloaded_for
+
+    model = get_category_model()
+    newest = max((posting_version(c) for c in candidates), default=0)
+
+    if newest > (model.version if model is not None else 0) and newest > _reloaded_for:
+        # one reload per newer version, even if the stored model lags behind
+        _reloaded_for = newest
+        print(f"Postings use category model {newest}; reloading the category model.")
+        model = reload_category_model()
+
+    return model
+
+
+def user_categories(user_vector, candidates=()):
+    """(version, the CATEGORY_MATCH_TOP categories nearest to the user),
+    inferred once per request; None when no model has been fit."""
+    model = current_category_model(candidates)
+    if model is None:
+        return None
+    return model.version, model.nearest(user_vector, Config.CATEGORY_MATCH_TOP)
+
+
+def fit_category_model(collection, k, sample_size):
+    """Fits centroids on a random sample of stored internships."""
+    sample = list(collection.aggregate([
+        {"$match": {"embedding": {"$exists": True}}},
+        {"$sample": {"size": sample_size}},
+        {"$project": {"embedding": 1, "jobRole": 1}}
+    ]))
+    if not sample:
+        return None
+
+    vectors = np.array([doc["embedding"] for doc in sample], dtype=np.float32)
+    centroids = fit_centroids(vectors, k)
+    assignment = nearest_categories(centroids, vectors)[:, 0]
+
+    labels = category_labels(assignment, [doc.get("jobRole") for doc in sample], len(centroids))
+    return CategoryModel(centroids, labels, version=int(time.time()))
+
+
+def classify_collection(collection, model, batch_size=500):
+    """Writes categoryId and categoryVersion on every internship; returns
+    how many were updated."""
+    total = 0
+    batch = []
+
+    def flush():
+        vectors = np.array([doc["embedding"] for doc in batch], dtype=np.float32)
+        categories = nearest_categories(model.centroids, vectors)[:, 0]
+        collection.bulk_write(
+            [UpdateOne({"_id": doc["_id"]}, {"$set": {"categoryId": int(c), "categoryVersion": model.version}}) for doc, c in zip(batch, categories)],
+            ordered=False
+        )
+        return len(batch)
+
+    for doc in collection.find({"embedding": {"$exists": True}}, {"embedding": 1}):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            total += flush()
+            batch = []
+
+    if batch:
+        total += flush()
+
+    return total
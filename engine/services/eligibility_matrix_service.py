@@ -0,0 +1,303 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from bson import ObjectId
+from pymongo import ReplaceOne
+from config.config import Config
+from db.mongo import get_db, get_async_db
+from utils.tracing import stage
+from services.eligibility_service import (
+    compute_eligibility,
+    find_internship,
+    eligible_users,
+    eligible_users_async,
+)
+
+INTERNSHIP_WATCH_FIELDS = ("embedding", "description", "jobTitle", "jobRole", "jobTopic")
+RESUME_WATCH_FIELDS = ("embedding", "resumeJSONdata", "resumeReview", "rerankText")
+
+
+def now():
+    return datetime.now(timezone.utc)
+
+
+def build_row(internship_id, result, computed_at=None):
+    """Matrix row for one internship. `eligible_users` is cut to the top K;
+    `all_ranked_results` is kept whole (at most the 200 vector search hits)
+    because it is what resume updates are matched against."""
+    return {
+        "_id": ObjectId(internship_id),
+        "eligible_users": result["eligible_users"][:Config.ELIGIBILITY_TOP_K],
+        "all_ranked_results": result["all_ranked_results"],
+        "computedAt": computed_at or now(),
+    }
+
+
+def row_response(row, source):
+    computed_at = row["computedAt"]
+    if computed_at.tzinfo is None:
+        computed_at = computed_at.replace(tzinfo=timezone.utc)
+
+    return {
+        "eligible_users": row["eligible_users"],
+        "all_ranked_results": row["all_ranked_results"],
+        "computedAt": computed_at.isoformat(),
+        "source": source,
+    }
+
+
+def is_fresh(row):
+    if not row:
+        return False
+    if Config.ELIGIBILITY_MAX_AGE_SECONDS <= 0:
+        return True
+
+    computed_at = row["computedAt"]
+    if computed_at.tzinfo is None:
+        computed_at = computed_at.replace(tzinfo=timezone.utc)
+
+    return now() - computed_at <= timedelta(seconds=Config.ELIGIBILITY_MAX_AGE_SECONDS)
+
+
+class EligibilityMatrix:
+    """Top-K eligible users per internship, stored in Mongo and kept current
+    by recomputing only the rows a resume or internship change can affect.
+
+    The cross scores are min-max normalized and cut at the median within each
+    internship's candidate set, so a single changed resume can move every
+    score in the rows it appears in. Rows are therefore always recomputed
+    whole with `compute_eligibility`, which keeps them identical to what the
+    live endpoint would return."""
+
+    def __init__(self, db, workers=2):
+        self.db = db
+        self.rows = db[Config.ELIGIBILITY_COLLECTION]
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.watchers = []
+        self.counters = {"served": 0, "computed_live": 0, "refreshed": 0, "refresh_failures": 0}
+
+    def ensure_indexes(self):
+        self.rows.create_index("all_ranked_results.userId")
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def get(self, internship_id):
+        return self.rows.find_one({"_id": ObjectId(internship_id)})
+
+    def store(self, internship_id, result, computed_at=None):
+        self.rows.replace_one(
+            {"_id": ObjectId(internship_id)},
+            build_row(internship_id, result, computed_at),
+            upsert=True
+        )
+
+    def store_many(self, rows):
+        if rows:
+            self.rows.bulk_write([ReplaceOne({"_id": row["_id"]}, row, upsert=True) for row in rows])
+
+    def refresh_internship(self, internship_id):
+        """Recomputes one row. Internships that were deleted or lost their
+        embedding are dropped from the matrix."""
+        internship = find_internship(self.db, internship_id)
+
+        if not internship or "embedding" not in internship:
+            self.rows.delete_one({"_id": ObjectId(internship_id)})
+            return None
+
+        computed_at = now()
+        result = compute_eligibility(self.db, internship)
+        self.store(internship_id, result, computed_at)
+        self.count("refreshed")
+
+        return result
+
+    def affected_by_resume(self, user_id):
+        """Internships whose row a change to this user's resume can alter: the
+        rows the user already appears in, plus the postings nearest to the new
+        resume embedding (where the user may newly enter the top 200)."""
+        user_id = str(user_id)
+
+        affected = {
+            str(row["_id"])
+            for row in self.rows.find({"all_ranked_results.userId": user_id}, {"_id": 1})
+        }
+
+        resume = self.db["resumedatas"].find_one(
+            {"userId": ObjectId(user_id) if ObjectId.is_valid(user_id) else user_id},
+            {"embedding": 1}
+        )
+
+        if resume and resume.get("embedding"):
+            nearest = self.db["new_internships_data"].aggregate([
+                {
+                    "$vectorSearch": {
+                        "index": "vector_index",
+                        "path": "embedding",
+                        "queryVector": resume["embedding"],
+                        "numCandidates": Config.ELIGIBILITY_RESUME_FANOUT * 10,
+                        "limit": Config.ELIGIBILITY_RESUME_FANOUT
+                    }
+                },
+                {"$project": {"_id": 1}}
+            ])
+            affected.update(str(doc["_id"]) for doc in nearest)
+
+        return affected
+
+    def schedule(self, internship_ids):
+        """Queues row refreshes. An internship already waiting for a refresh
+        is not queued twice, so a burst of resume updates touching the same
+        posting costs one recompute."""
+        scheduled = 0
+
+        for internship_id in internship_ids:
+            internship_id = str(internship_id)
+
+            with self.lock:
+                if internship_id in self.pending:
+                    continue
+                self.pending.add(internship_id)
+
+            self.executor.submit(self._refresh_pending, internship_id)
+            scheduled += 1
+
+        return scheduled
+
+    def _refresh_pending(self, internship_id):
+        with self.lock:
+            self.pending.discard(internship_id)
+
+        try:
+            self.refresh_internship(internship_id)
+        except Exception as e:
+            self.count("refresh_failures")
+            print(f"Eligibility refresh failed for {internship_id}:", e)
+
+    def on_resume_changed(self, user_id):
+        return self.schedule(self.affected_by_resume(user_id))
+
+    def on_internship_changed(self, internship_id):
+        return self.schedule([internship_id])
+
+    def start_watcher(self):
+        """Follows internship and resume writes through change streams and
+        refreshes the affected rows. Needs a replica set (Atlas); failures are
+        logged and ELIGIBILITY_MAX_AGE_SECONDS is left as the fallback."""
+        if self.watchers:
+            return
+
+        def changed(event, fields):
+            if event["operationType"] != "update":
+                return True
+            updated = event.get("updateDescription", {}).get("updatedFields", {})
+            return any(key.split(".")[0] in fields for key in updated)
+
+        def watch_internships():
+            try:
+                with self.db["new_internships_data"].watch() as stream:
+                    for event in stream:
+                        if changed(event, INTERNSHIP_WATCH_FIELDS):
+                            self.on_internship_changed(event["documentKey"]["_id"])
+            except Exception as e:
+                print("Eligibility internship change stream stopped:", e)
+
+        def watch_resumes():
+            try:
+                with self.db["resumedatas"].watch(full_document="updateLookup") as stream:
+                    for event in stream:
+                        document = event.get("fullDocument")
+                        if document and document.get("userId") and changed(event, RESUME_WATCH_FIELDS):
+                            self.on_resume_changed(document["userId"])
+            except Exception as e:
+                print("Eligibility resume change stream stopped:", e)
+
+        for target in (watch_internships, watch_resumes):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.watchers.append(thread)
+
+    def stats(self):
+        with self.lock:
+            counters = dict(self.counters)
+            counters["pending"] = len(self.pending)
+
+        counters["rows"] = self.rows.estimated_document_count()
+        return counters
+
+
+eligibility_matrix = None
+_init_lock = threading.Lock()
+
+
+def get_eligibility_matrix():
+    global eligibility_matrix
+
+    if eligibility_matrix is None:
+        with _init_lock:
+            if eligibility_matrix is None:
+                matrix = EligibilityMatrix(get_db(), workers=Config.ELIGIBILITY_WORKERS)
+                if Config.ELIGIBILITY_WATCH:
+                    matrix.start_watcher()
+                eligibility_matrix = matrix
+
+    return eligibility_matrix
+
+
+def serve_eligible_users(data):
+    """Eligible users for a posting from the precomputed matrix, falling back
+    to (and storing) a live computation when the row is missing or older than
+    ELIGIBILITY_MAX_AGE_SECONDS. `"fresh": true` forces the live path."""
+    internship_id = data.get("internshipId")
+
+    if not Config.ELIGIBILITY_MATRIX_ENABLED or not internship_id or not ObjectId.is_valid(internship_id):
+        return eligible_users(data)
+
+    matrix = get_eligibility_matrix()
+
+    if not data.get("fresh"):
+        with stage("eligibility.matrix_lookup"):
+            row = matrix.get(internship_id)
+        if is_fresh(row):
+            matrix.count("served")
+            return row_response(row, "matrix")
+
+    computed_at = now()
+    result = eligible_users(data)
+    if isinstance(result, tuple):
+        return result
+
+    matrix.store(internship_id, result, computed_at)
+    matrix.count("computed_live")
+
+    return row_response(build_row(internship_id, result, computed_at), "live")
+
+
+async def serve_eligible_users_async(data):
+    internship_id = data.get("internshipId")
+
+    if not Config.ELIGIBILITY_MATRIX_ENABLED or not internship_id or not ObjectId.is_valid(internship_id):
+        return await eligible_users_async(data)
+
+    rows = get_async_db()[Config.ELIGIBILITY_COLLECTION]
+
+    if not data.get("fresh"):
+        with stage("eligibility.matrix_lookup"):
+            row = await rows.find_one({"_id": ObjectId(internship_id)})
+        if is_fresh(row):
+            get_eligibility_matrix().count("served")
+            return row_response(row, "matrix")
+
+    computed_at = now()
+    result = await eligible_users_async(data)
+    if isinstance(result, tuple):
+        return result
+
+    row = build_row(internship_id, result, computed_at)
+    await rows.replace_one({"_id": row["_id"]}, row, upsert=True)
+    get_eligibility_matrix().count("computed_live")
+
+    return row_response(row, "live")
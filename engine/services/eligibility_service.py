@@ -1,109 +1,152 @@
-from pymongo import MongoClient
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from bson import ObjectId
 import numpy as np
-from services.reranker_service import rerank
-from config.config import Config  
+from services.reranker_service import rerank_scores, rerank_scores_async
+from db.mongo import get_db, get_async_db
+from utils.text_utils import term_set, json_values_text, build_rerank_text
+from utils.tracing import stage
+from config.config import Config
 
+INTERNSHIP_PROJECTION = {"embedding": 1, "description": 1, "jobTitle": 1, "jobRole": 1, "jobTopic": 1}
 
-def eligible_users(data):
-    internship_id = data.get("internshipId")
 
-    if not internship_id:
-        return {"error": "Invalid input. Provide 'internshipId'"}, 400
+def empty_result():
+    return {"eligible_users": [], "all_ranked_results": []}
 
-    try:
-        client = MongoClient(Config.MONGO_URI)  
-        db = client[Config.DB_NAME]              
-
-        internship_collection = db["new_internships_data"]
-        resume_collection = db["resumedatas"]
-
-        internship = internship_collection.find_one(
-            {"_id": ObjectId(internship_id)},
-            {"embedding": 1, "description": 1, "jobTitle": 1, "jobRole": 1, "jobTopic": 1}
-        )
-
-        if not internship or "embedding" not in internship:
-            return {"error": "Internship not found or missing embedding"}, 404
-
-        internship_embedding = internship["embedding"]
-        internship_desc = internship.get("description", "Internship posting")
-
-        pipeline = [
-            {
-                "$vectorSearch": {
-                    "index": "vector_index2",
-                    "path": "embedding",
-                    "queryVector": internship_embedding,
-                    "numCandidates": 2000,
-                    "limit": 200
-                }
-            },
-            {
-                "$project": {
-                    "_id": 0,
-                    "userId": 1,
-                    "embedding": 1,
-                    "resumeJSONdata": 1,
-                    "resumeReview": 1,
-                    "vectorScore": {"$meta": "vectorSearchScore"}
-                }
+
+def build_resume_pipeline(internship_embedding):
+    return [
+        {
+            "$vectorSearch": {
+                "index": "vector_index2",
+                "path": "embedding",
+                "queryVector": internship_embedding,
+                "numCandidates": 2000,
+                "limit": 200
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "userId": 1,
+                "embedding": 1,
+                "resumeJSONdata": 1,
+                "resumeReview": 1,
+                "rerankText": 1,
+                "updatedAt": 1,
+                "vectorScore": {"$meta": "vectorSearchScore"}
             }
-        ]
+        }
+    ]
+
+
+resume_terms_cache = OrderedDict()
+resume_terms_lock = threading.Lock()
 
-        resumes = list(resume_collection.aggregate(pipeline))
-        if not resumes:
-            return {"eligible_users": [], "all_ranked_results": []}
 
-        keywords = f"{internship.get('jobTitle','')} {internship.get('jobRole','')} {internship.get('jobTopic','')} {internship.get('description','')}".lower().split()
+def resume_terms(resume):
+    """Term set of a resume's parsed JSON. Cached per (userId, updatedAt), so
+    a resume is tokenized once until it is re-uploaded."""
+    updated_at = resume.get("updatedAt")
+    if updated_at is None:
+        return term_set(json_values_text(resume.get("resumeJSONdata", "")))
 
-        filtered_resumes = []
-        for r in resumes:
-            resume_text = str(r.get("resumeJSONdata", "")).lower()
-            if any(k in resume_text for k in keywords):
-                filtered_resumes.append(r)
+    key = (str(resume.get("userId")), str(updated_at))
 
-        if not filtered_resumes:
-            return {"eligible_users": [], "all_ranked_results": []}
+    with resume_terms_lock:
+        terms = resume_terms_cache.get(key)
+        if terms is not None:
+            resume_terms_cache.move_to_end(key)
+            return terms
 
-        resumes = filtered_resumes
+    terms = term_set(json_values_text(resume.get("resumeJSONdata", "")))
 
-        documents = [
-            str(r.get("resumeJSONdata", ""))
-            for r in resumes
-        ]
+    with resume_terms_lock:
+        resume_terms_cache[key] = terms
+        while len(resume_terms_cache) > Config.KEYWORD_CACHE_SIZE:
+            resume_terms_cache.popitem(last=False)
 
-        results = rerank(
-            query=internship_desc,
-            documents=documents
-        )
+    return terms
 
-        cross_scores = np.array([
-            r["relevance_score"] for r in results
-        ])
 
-        if cross_scores.max() != cross_scores.min():
-            cross_scores = (cross_scores - cross_scores.min()) / (cross_scores.max() - cross_scores.min())
-        else:
-            cross_scores = np.ones_like(cross_scores) * 0.5
+@lru_cache(maxsize=1024)
+def posting_terms(text):
+    return term_set(text)
 
-        vector_scores = np.array([r["vectorScore"] for r in resumes])
-        hybrid_scores = 0.6 * vector_scores + 0.4 * cross_scores
 
-        percentile_threshold = np.percentile(hybrid_scores, 50)
+def internship_terms(internship):
+    return posting_terms(
+        f"{internship.get('jobTitle','')} {internship.get('jobRole','')} {internship.get('jobTopic','')} {internship.get('description','')}"
+    )
 
-        min_vector_score = 0.5
-        min_cross_score = 0.3
 
-        eligible_users = []
-        ranked_results = []
+def keyword_filter(internship, resumes):
+    """Keeps resumes sharing at least KEYWORD_MIN_OVERLAP non-stop-word terms
+    with the posting (or all of them, for postings with fewer terms)."""
+    keywords = internship_terms(internship)
+    if not keywords:
+        return resumes
+
+    min_overlap = min(Config.KEYWORD_MIN_OVERLAP, len(keywords))
+
+    return [
+        r for r in resumes
+        if len(keywords & resume_terms(r)) >= min_overlap
+    ]
+
+
+def rerank_documents(resumes):
+    """Stored rerankText when the resume has one, otherwise the same compact
+    text built on the fly for resumes saved before it existed."""
+    return [r.get("rerankText") or resume_rerank_text(r) for r in resumes]
+
+
+def resume_rerank_text(resume):
+    data = resume.get("resumeJSONdata", "")
+    try:
+        return build_rerank_text(data, Config.RESUME_RERANK_MAX_CHARS)
+    except Exception as e:
+        print("Could not build rerankText for", resume.get("userId"), e)
+        return json_values_text(data)[:Config.RESUME_RERANK_MAX_CHARS]
+
 
-        for r, ce_score, hybrid_score in zip(resumes, cross_scores, hybrid_scores):
-            user_id = str(r["userId"])
-            vector_score = r["vectorScore"]
-            final_score = hybrid_score
+def rank_resumes(resumes, cross_scores):
+    """Hybrid 0.6 vector + 0.4 normalized cross score, cut at the median."""
+    cross_scores = np.asarray(cross_scores, dtype=float)
 
-            ranked_results.append({
+    if cross_scores.max() != cross_scores.min():
+        cross_scores = (cross_scores - cross_scores.min()) / (cross_scores.max() - cross_scores.min())
+    else:
+        cross_scores = np.ones_like(cross_scores) * 0.5
+
+    vector_scores = np.array([r["vectorScore"] for r in resumes])
+    hybrid_scores = 0.6 * vector_scores + 0.4 * cross_scores
+
+    percentile_threshold = np.percentile(hybrid_scores, 50)
+
+    min_vector_score = 0.5
+    min_cross_score = 0.3
+
+    eligible_users = []
+    ranked_results = []
+
+    for r, ce_score, hybrid_score in zip(resumes, cross_scores, hybrid_scores):
+        user_id = str(r["userId"])
+        vector_score = r["vectorScore"]
+        final_score = hybrid_score
+
+        ranked_results.append({
+            "userId": user_id,
+            "vector_score": float(vector_score),
+            "cross_score": float(ce_score),
+            "final_score": float(final_score),
+            "resumeReview": r.get("resumeReview")
+        })
+
+        if final_score >= percentile_threshold and vector_score >= min_vector_score and ce_score >= min_cross_score:
+            eligible_users.append({
                 "userId": user_id,
                 "vector_score": float(vector_score),
                 "cross_score": float(ce_score),
@@ -111,30 +154,118 @@ def eligible_users(data):
                 "resumeReview": r.get("resumeReview")
             })
 
-            if final_score >= percentile_threshold and vector_score >= min_vector_score and ce_score >= min_cross_score:
-                eligible_users.append({
-                    "userId": user_id,
-                    "vector_score": float(vector_score),
-                    "cross_score": float(ce_score),
-                    "final_score": float(final_score),
-                    "resumeReview": r.get("resumeReview")
-                })
+    eligible_users = sorted(eligible_users, key=lambda x: x["final_score"], reverse=True)
 
-        eligible_users = sorted(eligible_users, key=lambda x: x["final_score"], reverse=True)
+    return {
+        "eligible_users": eligible_users,
+        "all_ranked_results": ranked_results
+    }
 
-        return {
-            "eligible_users": eligible_users,
-            "all_ranked_results": ranked_results
-        }
+
+def select_resumes(internship, resumes):
+    """Post-search steps shared by both serving modes: the keyword
+    prefilter over the vector-search hits."""
+    if not resumes:
+        return resumes
+
+    with stage("eligibility.keyword_filter", len(resumes)) as span:
+        resumes = keyword_filter(internship, resumes)
+        span.out(len(resumes))
+
+    return resumes
+
+
+def rerank_query(internship):
+    return internship.get("description", "Internship posting")
+
+
+def score_resumes(resumes, cross_scores):
+    with stage("eligibility.rank", len(resumes)) as span:
+        result = rank_resumes(resumes, cross_scores)
+        span.out(len(result["eligible_users"]))
+
+    return result
+
+
+def compute_eligibility(db, internship):
+    """Full eligibility ranking for one internship document. Shared by the
+    live endpoint and the precomputed matrix so both score identically."""
+    with stage("eligibility.resume_search") as span:
+        resumes = list(db["resumedatas"].aggregate(build_resume_pipeline(internship["embedding"])))
+        span.out(len(resumes))
+
+    resumes = select_resumes(internship, resumes)
+    if not resumes:
+        return empty_result()
+
+    with stage("eligibility.rerank", len(resumes)):
+        cross_scores = rerank_scores(query=rerank_query(internship), documents=rerank_documents(resumes))
+
+    return score_resumes(resumes, cross_scores)
+
+
+async def compute_eligibility_async(db, internship):
+    """compute_eligibility() on the async Mongo client and reranker."""
+    with stage("eligibility.resume_search") as span:
+        cursor = await db["resumedatas"].aggregate(build_resume_pipeline(internship["embedding"]))
+        resumes = await cursor.to_list(length=None)
+        span.out(len(resumes))
+
+    resumes = select_resumes(internship, resumes)
+    if not resumes:
+        return empty_result()
+
+    with stage("eligibility.rerank", len(resumes)):
+        cross_scores = await rerank_scores_async(query=rerank_query(internship), documents=rerank_documents(resumes))
+
+    return score_resumes(resumes, cross_scores)
+
+
+def find_internship(db, internship_id):
+    """The posting's embedding and text; a coroutine on the async client."""
+    return db["new_internships_data"].find_one(
+        {"_id": ObjectId(internship_id)},
+        INTERNSHIP_PROJECTION
+    )
+
+
+def internship_error(internship):
+    if not internship or "embedding" not in internship:
+        return {"error": "Internship not found or missing embedding"}, 404
+    return None
+
+
+def eligible_users(data):
+    internship_id = data.get("internshipId")
+
+    if not internship_id:
+        return {"error": "Invalid input. Provide 'internshipId'"}, 400
+
+    try:
+        db = get_db()
+
+        with stage("eligibility.internship_lookup"):
+            internship = find_internship(db, internship_id)
+
+        return internship_error(internship) or compute_eligibility(db, internship)
+
+    except Exception as e:
+        return {"error": f"Failed to compute eligibility: {e}"}, 500
+
+
+async def eligible_users_async(data):
+    internship_id = data.get("internshipId")
+
+    if not internship_id:
+        return {"error": "Invalid input. Provide 'internshipId'"}, 400
+
+    try:
+        db = get_async_db()
+
+        with stage("eligibility.internship_lookup"):
+            internship = await find_internship(db, internship_id)
+
+        return internship_error(internship) or await compute_eligibility_async(db, internship)
 
     except Exception as e:
         return {"error": f"Failed to compute eligibility: {e}"}, 500
-    
-    
-    
-    
-    
-    
-    
-    
-    
\ No newline at end of file
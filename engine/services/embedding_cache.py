@@ -0,0 +1,111 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+from config.config import Config
+
+
+def cache_key(model, text):
+    """Content address of an embedding: the model plus whitespace-normalized text."""
+    normalized = " ".join(str(text).split())
+    return hashlib.sha256(f"{model}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """In-memory LRU of float32 vectors bounded by a byte budget, with an
+    optional SQLite tier that survives restarts."""
+
+    def __init__(self, max_bytes, path=None):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+            self.db.commit()
+
+    def get(self, key):
+        with self.lock:
+            vector = self.entries.get(key)
+            if vector is not None:
+                self.entries.move_to_end(key)
+                self.memory_hits += 1
+                return vector.tolist()
+
+            if self.db is not None:
+                row = self.db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector.tolist()
+
+            self.misses += 1
+            return None
+
+    def put(self, key, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+
+        with self.lock:
+            self._remember(key, vector)
+
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    (key, vector.tobytes())
+                )
+                self.db.commit()
+
+    def _remember(self, key, vector):
+        if key in self.entries:
+            self.bytes -= self.entries.pop(key).nbytes
+
+        self.entries[key] = vector
+        self.bytes += vector.nbytes
+
+        while self.bytes > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "persistent": self.db is not None,
+            }
+
+
+embedding_cache = None
+_init_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    global embedding_cache
+
+    if embedding_cache is None:
+        with _init_lock:
+            if embedding_cache is None:
+                embedding_cache = EmbeddingCache(
+                    Config.EMBED_CACHE_MAX_BYTES,
+                    path=Config.EMBED_CACHE_PATH
+                )
+
+    return embedding_cache
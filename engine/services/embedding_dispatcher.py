@@ -0,0 +1,185 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+import numpy as np
+from huggingface_hub import InferenceClient
+from config.config import Config
+from services.embedding_cache import cache_key, get_embedding_cache
+
+MODEL = Config.BI_ENCODER_MODEL
+
+
+class EmbeddingDispatcher:
+    """Collects concurrent embedding requests into micro-batches so many
+    callers share one inference call. Each caller gets its vector back
+    through its own Future. Texts already in the embedding cache never
+    reach the queue."""
+
+    def __init__(self, encode_batch, max_batch_size, max_wait_ms, name="embedding", cache=None, workers=1):
+        self.encode_batch = encode_batch
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+
+        self.queue = queue.Queue()
+        self.stats_lock = threading.Lock()
+        self.batch_sizes = Counter()
+        self.max_queue_depth = 0
+        self.failed_batches = 0
+        self.encode_seconds = 0.0
+
+        self.workers = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, text):
+        future = Future()
+
+        key = None
+        if self.cache is not None:
+            key = cache_key(MODEL, text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                future.set_result(cached)
+                return future
+
+        self.queue.put((text, key, future))
+
+        depth = self.queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+        return future
+
+    def embed(self, text):
+        return self.submit(text).result()
+
+    def embed_many(self, texts):
+        futures = [self.submit(t) for t in texts]
+        return [f.result() for f in futures]
+
+    async def embed_async(self, text):
+        # awaits the batch without blocking the event loop
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # identical texts submitted together are encoded once
+            texts = list(dict.fromkeys(text for text, _, _ in batch))
+
+            start = time.perf_counter()
+            try:
+                vectors = dict(zip(texts, self.encode_batch(texts)))
+            except Exception as e:
+                with self.stats_lock:
+                    self.failed_batches += 1
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            with self.stats_lock:
+                self.batch_sizes[len(batch)] += 1
+                self.encode_seconds += time.perf_counter() - start
+
+            for text, key, future in batch:
+                future.set_result(vectors[text])
+                if key is not None:
+                    # a cache write error must not kill the worker thread
+                    try:
+                        self.cache.put(key, vectors[text])
+                    except Exception as e:
+                        print("Embedding cache write failed:", e)
+
+    def stats(self):
+        with self.stats_lock:
+            batches = sum(self.batch_sizes.values())
+            texts = sum(size * count for size, count in self.batch_sizes.items())
+            return {
+                "name": self.name,
+                "queue_depth": self.queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "batches": batches,
+                "texts": texts,
+                "failed_batches": self.failed_batches,
+                "mean_batch_size": texts / batches if batches else 0.0,
+                "mean_encode_ms": 1000 * self.encode_seconds / batches if batches else 0.0,
+                "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            }
+
+
+def hf_encoder(api_key):
+    client = InferenceClient(api_key=api_key)
+
+    def encode(texts):
+        # The feature-extraction endpoint accepts a list of inputs and returns one row per text
+        output = np.asarray(client.feature_extraction(texts, model=MODEL))
+        if output.ndim != 2 or output.shape[0] != len(texts):
+            # e.g. token-level (texts, tokens, dim) output from an unpooled model
+            raise ValueError(f"Expected {len(texts)} pooled embeddings, got shape {output.shape}")
+        return output.tolist()
+
+    return encode
+
+
+def local_encoder():
+    # imported here so the HF backend never pays for loading torch
+    from models.ml_model import get_bi_encoder
+
+    def encode(texts):
+        return get_bi_encoder().encode(
+            texts,
+            batch_size=Config.EMBED_MAX_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ).tolist()
+
+    return encode
+
+
+dispatchers = {}
+_registry_lock = threading.Lock()
+
+
+def get_dispatcher(api_key=None):
+    """One dispatcher per HF token (callers spread load over separate tokens),
+    or a single shared one when embeddings are computed locally."""
+    key = "local" if Config.EMBEDDING_BACKEND == "local" else api_key
+
+    with _registry_lock:
+        if key not in dispatchers:
+            encoder = local_encoder() if key == "local" else hf_encoder(api_key)
+            dispatchers[key] = EmbeddingDispatcher(
+                encoder,
+                max_batch_size=Config.EMBED_MAX_BATCH_SIZE,
+                max_wait_ms=Config.EMBED_MAX_WAIT_MS,
+                name=f"embedding-{len(dispatchers)}" if key != "local" else "embedding-local",
+                cache=get_embedding_cache() if Config.EMBED_CACHE_ENABLED else None,
+                workers=Config.EMBED_WORKERS
+            )
+
+        return dispatchers[key]
+
+
+def dispatcher_stats():
+    with _registry_lock:
+        return [d.stats() for d in dispatchers.values()]
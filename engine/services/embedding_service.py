@@ -1,40 +1,90 @@
 import os
 from dotenv import load_dotenv
-from huggingface_hub import InferenceClient
-from utils.text_utils import build_combined_text
+from services.embedding_dispatcher import get_dispatcher
+from utils.text_utils import build_combined_text, build_rerank_text
+from config.config import Config
+from utils.filters import typed_fields
+from services.skill_service import posting_skill_ids
+from services.category_service import category_fields
+from utils.tracing import stage
 
 load_dotenv()
 
-client = InferenceClient(api_key=os.getenv("HF_TOKEN_ONE"))
+dispatcher = get_dispatcher(os.getenv("HF_TOKEN_ONE"))
 
-MODEL = "BAAI/bge-large-en-v1.5"
-
-def embed_job(data):
+def job_text(data):
+    """Returns (combined text, None) or (None, error response)."""
     if not data or not isinstance(data, dict):
-        return {"error": "Invalid input. Expected a JSON object with job details."}, 400
+        return None, ({"error": "Invalid input. Expected a JSON object with job details."}, 400)
 
-    try:
-        combined_text = build_combined_text(data)
+    combined_text = build_combined_text(data)
+
+    if not combined_text:
+        return None, ({"error": "No valid text to generate embedding."}, 400)
+
+    return combined_text, None
 
-        if not combined_text:
-            return {"error": "No valid text to generate embedding."}, 400
+
+def job_result(data, embedding):
+    result = data.copy()
+    result.update(typed_fields(data))
+    result["skillIds"] = posting_skill_ids(data)
+    result.update(category_fields(embedding))
+    result["embedding"] = embedding
+
+    return result
+
+
+def embed_job(data):
+    try:
+        combined_text, error = job_text(data)
+        if error:
+            return error
 
         print("Generating embedding for job data...")
 
-        embedding = client.feature_extraction(
-            combined_text,
-            model=MODEL
-        ).tolist()
+        with stage("embed.job"):
+            embedding = dispatcher.embed(combined_text)
+
+        return job_result(data, embedding)
+
+    except Exception as e:
+        return {"error": f"Failed to generate embedding: {e}"}, 500
 
-        result = data.copy()
-        result["embedding"] = embedding
 
-        return result
+async def embed_job_async(data):
+    try:
+        combined_text, error = job_text(data)
+        if error:
+            return error
+
+        with stage("embed.job"):
+            embedding = await dispatcher.embed_async(combined_text)
+
+        return job_result(data, embedding)
 
     except Exception as e:
         return {"error": f"Failed to generate embedding: {e}"}, 500
 
 
+def candidate_result(data, summary, embedding):
+    """Adds the compact rerank text when the caller sends the parsed resume,
+    so it can be stored next to the embedding."""
+    result = {
+        "summary": summary,
+        "embedding": embedding
+    }
+
+    if isinstance(data.get("resumeData"), dict):
+        # the embedding already succeeded; a bad resume shape only loses the rerank text
+        try:
+            result["rerankText"] = build_rerank_text(data["resumeData"], Config.RESUME_RERANK_MAX_CHARS)
+        except Exception as e:
+            print("Could not build rerankText:", e)
+
+    return result
+
+
 def embed_candidate(data):
     summary = data.get("summary")
 
@@ -44,17 +94,26 @@ def embed_candidate(data):
     try:
         print("Generating embedding for candidate summary...")
 
-        embedding = client.feature_extraction(
-            summary,
-            model=MODEL
-        ).tolist()
+        with stage("embed.candidate"):
+            embedding = dispatcher.embed(summary)
+
+        return candidate_result(data, summary, embedding)
+
+    except Exception as e:
+        return {"error": f"Failed to generate embedding: {e}"}, 500
+
+
+async def embed_candidate_async(data):
+    summary = data.get("summary")
+
+    if not summary or not isinstance(summary, str):
+        return {"error": "Invalid input"}, 400
 
-        result = {
-            "summary": summary,
-            "embedding": embedding
-        }
+    try:
+        with stage("embed.candidate"):
+            embedding = await dispatcher.embed_async(summary)
 
-        return result
+        return candidate_result(data, summary, embedding)
 
     except Exception as e:
         return {"error": f"Failed to generate embedding: {e}"}, 500
\ No newline at end of file
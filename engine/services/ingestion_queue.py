@@ -0,0 +1,262 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from config.config import Config
+from services.resume_vector_service import store_resume_chunks
+from utils.text_utils import build_resume_text
+
+ACTIVE_STATUSES = ("queued", "running", "retrying")
+
+
+class IngestionQueue:
+    """Background resume ingestion: enqueue returns a job id right away and a
+    worker pool builds, chunks, embeds and upserts the resume. The newest
+    job per userId wins; an older in-flight job for the same user is
+    cancelled, and the replacement waits until it has stopped. Jobs can be
+    journaled to SQLite so queued work survives a restart."""
+
+    def __init__(self, workers, max_retries, backoff_seconds, journal_path=None):
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.payloads = {}
+        self.latest_by_user = {}
+        self.queue = queue.Queue()
+
+        # one job per user at a time; a job that finds its user busy waits here
+        self.running_users = set()
+        self.waiting_by_user = {}
+
+        self.journal = None
+        if journal_path:
+            self.journal = sqlite3.connect(journal_path, check_same_thread=False)
+            self.journal.execute(
+                "CREATE TABLE IF NOT EXISTS ingestion_jobs ("
+                "job_id TEXT PRIMARY KEY, user_id TEXT, job TEXT, payload TEXT)"
+            )
+            self.journal.commit()
+            self._recover()
+
+        for _ in range(workers):
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def enqueue(self, user_id, resume_json):
+        user_id = str(user_id)
+        now = time.time()
+        job = {
+            "jobId": uuid.uuid4().hex,
+            "userId": user_id,
+            "status": "queued",
+            "attempts": 0,
+            "storedChunks": 0,
+            "totalChunks": None,
+            "error": None,
+            "result": None,
+            "createdAt": now,
+            "updatedAt": now
+        }
+
+        with self.lock:
+            self._prune()
+
+            previous = self.jobs.get(self.latest_by_user.get(user_id))
+            if previous and previous["status"] in ACTIVE_STATUSES:
+                previous["status"] = "superseded"
+                previous["supersededBy"] = job["jobId"]
+                previous["updatedAt"] = now
+                self._write(previous)
+                self.payloads.pop(previous["jobId"], None)
+
+            self.jobs[job["jobId"]] = job
+            self.payloads[job["jobId"]] = resume_json
+            self.latest_by_user[user_id] = job["jobId"]
+            self._write(job, resume_json)
+
+        self.queue.put(job["jobId"])
+        return dict(job)
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job:
+                return dict(job)
+
+            if self.journal is not None:
+                row = self.journal.execute(
+                    "SELECT job FROM ingestion_jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()
+                if row:
+                    return json.loads(row[0])
+
+        return None
+
+    def stats(self):
+        with self.lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"queue_depth": self.queue.qsize(), "jobs": counts}
+
+    def _update(self, job, **fields):
+        """Applies fields to the job unless it has been superseded meanwhile."""
+        with self.lock:
+            if "status" in fields and self._is_superseded(job):
+                return False
+            job.update(fields, updatedAt=time.time())
+            self._write(job)
+            return True
+
+    def _prune(self):
+        cutoff = time.time() - Config.INGEST_JOB_RETENTION_SECONDS
+        for job_id, job in list(self.jobs.items()):
+            if job["status"] not in ACTIVE_STATUSES and job["updatedAt"] < cutoff:
+                del self.jobs[job_id]
+
+    def _is_superseded(self, job):
+        return job["status"] == "superseded"
+
+    def _run(self):
+        while True:
+            job_id = self.queue.get()
+
+            with self.lock:
+                job = self.jobs.get(job_id)
+                payload = self.payloads.get(job_id)
+
+                if not job or payload is None:
+                    continue
+
+                # a superseded job of this user may still be upserting; run
+                # after it so its in-flight batches cannot overwrite ours
+                if job["userId"] in self.running_users:
+                    self.waiting_by_user[job["userId"]] = job_id
+                    continue
+
+                self.running_users.add(job["userId"])
+
+            try:
+                self._process(job, payload)
+            finally:
+                with self.lock:
+                    self.running_users.discard(job["userId"])
+                    waiting = self.waiting_by_user.pop(job["userId"], None)
+                if waiting:
+                    self.queue.put(waiting)
+
+    def _process(self, job, payload):
+        job_id = job["jobId"]
+
+        if not self._update(job, status="running", attempts=job["attempts"] + 1):
+            return
+
+        try:
+            resume_text = build_resume_text(payload)
+            result = store_resume_chunks(
+                job["userId"],
+                resume_text,
+                on_progress=lambda stored, total: self._update(job, storedChunks=stored, totalChunks=total),
+                is_cancelled=lambda: self._is_superseded(job)
+            )
+        except Exception as e:
+            self._retry_or_fail(job, e)
+            return
+
+        if result.get("cancelled"):
+            return
+
+        self._update(job, status="completed", result=result, totalChunks=result["total_chunks"])
+        with self.lock:
+            self.payloads.pop(job_id, None)
+
+    def _retry_or_fail(self, job, error):
+        if job["attempts"] > self.max_retries:
+            self._update(job, status="failed", error=str(error))
+            with self.lock:
+                self.payloads.pop(job["jobId"], None)
+            return
+
+        delay = self.backoff_seconds * (2 ** (job["attempts"] - 1))
+        if not self._update(job, status="retrying", error=str(error), retryInSeconds=delay):
+            return
+        print(f"Ingestion job {job['jobId']} failed ({error}), retrying in {delay}s")
+
+        timer = threading.Timer(delay, self.queue.put, args=(job["jobId"],))
+        timer.daemon = True
+        timer.start()
+
+    def _write(self, job, payload=None):
+        if self.journal is None:
+            return
+
+        if payload is not None:
+            self.journal.execute(
+                "INSERT OR REPLACE INTO ingestion_jobs (job_id, user_id, job, payload) VALUES (?, ?, ?, ?)",
+                (job["jobId"], job["userId"], json.dumps(job), json.dumps(payload))
+            )
+        elif job["status"] in ACTIVE_STATUSES:
+            self.journal.execute(
+                "UPDATE ingestion_jobs SET job = ? WHERE job_id = ?",
+                (json.dumps(job), job["jobId"])
+            )
+        else:
+            # finished jobs no longer need their resume payload
+            self.journal.execute(
+                "UPDATE ingestion_jobs SET job = ?, payload = NULL WHERE job_id = ?",
+                (json.dumps(job), job["jobId"])
+            )
+        self.journal.commit()
+
+    def _recover(self):
+        """Requeues the newest unfinished job per user from the journal."""
+        rows = self.journal.execute("SELECT job, payload FROM ingestion_jobs").fetchall()
+        jobs = sorted(
+            ((json.loads(job), json.loads(payload) if payload else None) for job, payload in rows),
+            key=lambda pair: pair[0]["createdAt"]
+        )
+
+        for job, payload in jobs:
+            if job["status"] not in ACTIVE_STATUSES or payload is None:
+                continue
+
+            previous = self.jobs.get(self.latest_by_user.get(job["userId"]))
+            if previous and previous["status"] in ACTIVE_STATUSES:
+                previous["status"] = "superseded"
+                self.payloads.pop(previous["jobId"], None)
+                self._write(previous)
+
+            job["status"] = "queued"
+            self._write(job)
+            self.jobs[job["jobId"]] = job
+            self.payloads[job["jobId"]] = payload
+            self.latest_by_user[job["userId"]] = job["jobId"]
+
+        for job_id in self.payloads:
+            self.queue.put(job_id)
+
+        if self.payloads:
+            print(f"Recovered {len(self.payloads)} ingestion jobs from the journal.")
+
+
+ingestion_queue = None
+_init_lock = threading.Lock()
+
+
+def get_ingestion_queue():
+    global ingestion_queue
+
+    if ingestion_queue is None:
+        with _init_lock:
+            if ingestion_queue is None:
+                ingestion_queue = IngestionQueue(
+                    workers=Config.INGEST_WORKERS,
+                    max_retries=Config.INGEST_MAX_RETRIES,
+                    backoff_seconds=Config.INGEST_RETRY_BACKOFF_SECONDS,
+                    journal_path=Config.INGEST_JOURNAL_PATH
+                )
+
+    return ingestion_queue
@@ -0,0 +1,190 @@
+import threading
+import time
+import numpy as np
+from db.mongo import get_collection
+from config.config import Config
+from utils.filters import build_columns, match_mask, meta_mask
+
+CANDIDATE_FIELDS = [
+    "jobTitle", "company", "description",
+    "jobRole", "jobTopic",
+    "duration", "type",
+    "stipend", "jobType",
+    "lastDate", "skills",
+    "numOfQns",
+    "locationName", "location",
+    "stipendMin", "stipendMax", "lastDateDay", "skillIds", "categoryId", "categoryVersion"
+]
+
+
+class LocalVectorIndex:
+    """Keeps every internship embedding in one float32 matrix so /recommend
+    can retrieve and filter in-process instead of calling $vectorSearch."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.lock = threading.Lock()
+        self.reload_lock = threading.Lock()
+
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.docs = []
+        self.columns = {}
+
+        self.loaded_at = 0.0
+        self.dirty = True
+        self.watcher = None
+
+    def load(self):
+        # writes seen while this scan runs mark the index dirty again
+        self.dirty = False
+
+        projection = {field: 1 for field in CANDIDATE_FIELDS}
+        projection["embedding"] = 1
+
+        docs, vectors = [], []
+        for doc in self.collection.find({"embedding": {"$exists": True}}, projection):
+            embedding = doc.pop("embedding", None)
+            if not embedding:
+                continue
+            docs.append(doc)
+            vectors.append(embedding)
+
+        if vectors:
+            matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix /= norms
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        columns = build_columns(docs)
+
+        with self.lock:
+            self.matrix = matrix
+            self.docs = docs
+            self.columns = columns
+            self.loaded_at = time.time()
+
+        print(f"Local vector index loaded: {len(docs)} internships.")
+
+    def refresh(self):
+        with self.reload_lock:
+            self.load()
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def needs_refresh(self):
+        stale = time.time() - self.loaded_at > Config.LOCAL_INDEX_REFRESH_SECONDS
+        return self.dirty or stale
+
+    def ensure_fresh(self):
+        """Starts a background rebuild when the index is stale or dirty.
+        Searches keep using the current matrix until the new one is swapped
+        in, so no request pays for the collection scan."""
+        if not self.needs_refresh():
+            return
+
+        # a rebuild already running will pick up the latest writes
+        if not self.reload_lock.acquire(blocking=False):
+            return
+
+        def rebuild():
+            try:
+                self.load()
+                while self.dirty:
+                    self.load()
+            except Exception as e:
+                # retried after LOCAL_INDEX_REFRESH_SECONDS or the next write
+                self.loaded_at = time.time()
+                print("Local vector index rebuild failed:", e)
+            finally:
+                self.reload_lock.release()
+
+        threading.Thread(target=rebuild, daemon=True).start()
+
+    def start_watcher(self):
+        """Rebuilds the index in the background after writes to the
+        collection. Needs a replica set (Atlas), so failures are logged and
+        the TTL refresh is left as the only refresh path."""
+        if self.watcher is not None:
+            return
+
+        def watch():
+            try:
+                with self.collection.watch() as stream:
+                    for _ in stream:
+                        self.mark_dirty()
+                        self.ensure_fresh()
+            except Exception as e:
+                print("Local index change stream stopped:", e)
+            self.watcher = None
+
+        self.watcher = threading.Thread(target=watch, daemon=True)
+        self.watcher.start()
+
+    def search(self, query_vector, limit=200, filters=None, with_embeddings=False):
+        """Top-`limit` internships that pass every metadata filter (duration,
+        type/jobType, stipend, availability), best first. `with_embeddings`
+        attaches each row of the index matrix as a view, not a copy."""
+        self.ensure_fresh()
+        filters = filters or {}
+
+        with self.lock:
+            matrix = self.matrix
+            docs = self.docs
+            columns = self.columns
+
+        if not docs:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        similarities = matrix @ query
+
+        mask = match_mask(columns, filters) & meta_mask(columns, filters)
+        positions = np.flatnonzero(mask)
+        if positions.size == 0:
+            return []
+
+        if positions.size > limit:
+            top = np.argpartition(-similarities[positions], limit - 1)[:limit]
+            positions = positions[top]
+
+        positions = positions[np.argsort(-similarities[positions], kind="stable")]
+
+        # Same scale as Atlas vectorSearchScore for cosine: (1 + cos) / 2
+        scores = (1.0 + similarities[positions]) / 2.0
+
+        if with_embeddings:
+            return [
+                dict(docs[p], score=float(s), embedding=matrix[p])
+                for p, s in zip(positions, scores)
+            ]
+
+        return [
+            dict(docs[p], score=float(s))
+            for p, s in zip(positions, scores)
+        ]
+
+
+local_index = None
+_init_lock = threading.Lock()
+
+
+def get_local_index():
+    global local_index
+
+    if local_index is None:
+        with _init_lock:
+            if local_index is None:
+                index = LocalVectorIndex(get_collection())
+                index.refresh()
+                if Config.LOCAL_INDEX_WATCH:
+                    index.start_watcher()
+                local_index = index
+
+    return local_index
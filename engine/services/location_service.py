@@ -0,0 +1,82 @@
+import threading
+import time
+from db.mongo import get_collection
+from config.config import Config
+
+
+class CityLookup:
+    """locationName -> distinct [lon, lat] coordinates, loaded in one
+    aggregation so the location filter does not query Mongo per request."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.lock = threading.Lock()
+        self.table = {}
+        self.loaded_at = 0.0
+
+    def load(self):
+        pipeline = [
+            {"$match": {"locationName": {"$ne": None}, "location.coordinates": {"$exists": True}}},
+            {"$group": {"_id": "$locationName", "coordinates": {"$addToSet": "$location.coordinates"}}}
+        ]
+
+        table = {doc["_id"]: doc["coordinates"] for doc in self.collection.aggregate(pipeline)}
+
+        with self.lock:
+            self.table = table
+            self.loaded_at = time.time()
+
+        print(f"City lookup loaded: {len(table)} locations.")
+
+    def ensure_fresh(self):
+        if time.time() - self.loaded_at > Config.LOCATION_TABLE_REFRESH_SECONDS:
+            self.load()
+
+    def coordinates_for(self, names):
+        self.ensure_fresh()
+
+        with self.lock:
+            table = self.table
+
+        coords = []
+        missing = []
+        for name in names:
+            if name in table:
+                coords.extend(table[name])
+            else:
+                missing.append(name)
+
+        if missing:
+            coords.extend(self.lookup_missing(missing))
+
+        return coords
+
+    def lookup_missing(self, names):
+        """Falls back to the collection for cities added since the last load."""
+        found = {}
+        for doc in self.collection.find({"locationName": {"$in": names}}, {"locationName": 1, "location": 1}):
+            location = doc.get("location")
+            if location and location.get("coordinates"):
+                found.setdefault(doc["locationName"], []).append(location["coordinates"])
+
+        with self.lock:
+            self.table = {**self.table, **found}
+
+        return [c for coords in found.values() for c in coords]
+
+
+city_lookup = None
+_init_lock = threading.Lock()
+
+
+def get_city_lookup():
+    global city_lookup
+
+    if city_lookup is None:
+        with _init_lock:
+            if city_lookup is None:
+                lookup = CityLookup(get_collection())
+                lookup.load()
+                city_lookup = lookup
+
+    return city_lookup
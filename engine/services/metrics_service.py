@@ -0,0 +1,54 @@
+import services.eligibility_matrix_service as eligibility_matrix_service
+import services.ingestion_queue as ingestion_queue_service
+import services.embedding_cache as embedding_cache_service
+import services.result_cache as result_cache_service
+import services.reranker_service as reranker_service
+import services.page_store as page_store_service
+from db.mongo import pool_metrics
+from services.embedding_dispatcher import dispatcher_stats
+from services.cascade_service import cascade_stats
+from utils.tracing import render_metrics
+
+
+def component_stats():
+    """(component, stats, labels) for every pool, queue and cache in the
+    process. Background services are only reported once they are running,
+    so scraping /metrics never starts them."""
+    components = [
+        ("mongo_pool", metrics.snapshot(), f'client="{name}"')
+        for name, metrics in pool_metrics.items()
+    ]
+
+    for stats in dispatcher_stats():
+        components.append(("embed_dispatcher", stats, f'name="{stats["name"]}"'))
+
+    # module-level instances are read directly: their getters would create them
+    for component, service in (
+        ("embedding_cache", embedding_cache_service.embedding_cache),
+        ("result_cache", result_cache_service.result_cache),
+        ("rerank_cache", reranker_service.score_cache),
+        ("page_store", page_store_service.page_store),
+    ):
+        if service is not None:
+            components.append((component, service.stats(), ""))
+    components.append(("rerank_cascade", cascade_stats.stats(), ""))
+
+    queue = ingestion_queue_service.ingestion_queue
+    if queue is not None:
+        stats = queue.stats()
+        components.append(("ingest", {"queue_depth": stats["queue_depth"]}, ""))
+        for status, count in stats["jobs"].items():
+            components.append(("ingest_jobs", {"count": count}, f'status="{status}"'))
+
+    matrix = eligibility_matrix_service.eligibility_matrix
+    if matrix is not None:
+        try:
+            components.append(("eligibility_matrix", matrix.stats(), ""))
+        except Exception as e:
+            print("Eligibility matrix stats unavailable:", e)
+
+    return components
+
+
+def metrics_text():
+    return render_metrics(component_stats())
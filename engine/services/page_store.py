@@ -0,0 +1,67 @@
+import secrets
+import threading
+from config.config import Config
+from services.result_cache import ResultCache, RedisResultCache
+
+
+class PageStore:
+    """Keeps a ranked /recommend list server-side for a short TTL so later
+    pages are sliced from it instead of re-running the pipeline. Cursors are
+    "<token>:<offset>"."""
+
+    def __init__(self, max_lists, ttl_seconds, redis_url=None):
+        # with several workers the next page may land on another process,
+        # so lists go to Redis whenever the result cache is shared there
+        if redis_url:
+            self.lists = RedisResultCache(redis_url, ttl_seconds, prefix="recommend_pages")
+        else:
+            self.lists = ResultCache(max_lists, ttl_seconds)
+
+    def first_page(self, items, page_size):
+        token = secrets.token_urlsafe(12)
+        self.lists.put(token, items)
+        return self.page_response(token, items, 0, page_size)
+
+    def next_page(self, cursor, page_size):
+        """Returns the page response, or None for unknown or expired cursors."""
+        token, _, offset = str(cursor).rpartition(":")
+
+        if not token or not offset.isdigit():
+            return None
+
+        items = self.lists.get(token)
+        if items is None:
+            return None
+
+        return self.page_response(token, items, int(offset), page_size)
+
+    def page_response(self, token, items, offset, page_size):
+        end = offset + page_size
+
+        return {
+            "results": items[offset:end],
+            "nextCursor": f"{token}:{end}" if end < len(items) else None,
+            "total": len(items)
+        }
+
+    def stats(self):
+        return self.lists.stats()
+
+
+page_store = None
+_init_lock = threading.Lock()
+
+
+def get_page_store():
+    global page_store
+
+    if page_store is None:
+        with _init_lock:
+            if page_store is None:
+                page_store = PageStore(
+                    Config.RECOMMEND_PAGE_MAX_LISTS,
+                    Config.RECOMMEND_PAGE_TTL_SECONDS,
+                    redis_url=Config.RESULT_CACHE_REDIS_URL
+                )
+
+    return page_store
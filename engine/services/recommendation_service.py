@@ -1,22 +1,53 @@
 from utils.filters import *
-from utils.geo_utils import haversine
-from db.mongo import get_collection
-from services.reranker_service import rerank
+from utils.geo_utils import within_radius, point_coordinates
+from utils.diversity import mmr_order
+from db.mongo import get_collection, get_async_collection
+from services.reranker_service import rerank_scores, rerank_scores_async
+from services.local_index_service import get_local_index
+from services.location_service import get_city_lookup
+from services.result_cache import get_result_cache, result_key
+from services.page_store import get_page_store
+from services.category_service import user_categories, posting_version
+from services.skill_service import get_skill_vocabulary, skill_overlap
+from services.cascade_service import rerank_depth, fill_cross_scores, cascade_stats
+from utils.tracing import stage
+from config.config import Config
+import asyncio
+import json
 import numpy as np
 
-
-def recommend(data):
-    collection = get_collection()
-    
-    if collection is None:
-        return {"error": "Server is not ready due to a startup failure."}, 503
-    
-    user_vector = data.get("embedding")
-    filters = data.get("filters", {})
-    resume_summary = data.get("resumeSummary", "").lower()
-
-    if not user_vector or not isinstance(user_vector, list):
-        return {"error": "Invalid input. Provide 'embedding' as a list of floats."}, 400
+# results returned when the caller does not ask for pages
+DEFAULT_RESULTS = 10
+
+# candidate fields read by the filters, the reranker and the response
+PROJECTION = {
+    "$project": {
+        "_id": 1,
+        "jobTitle": 1, "company": 1, "description": 1,
+        "jobRole": 1, "jobTopic": 1,
+        "duration": 1, "type": 1,
+        "stipend": 1, "jobType": 1,
+        "lastDate": 1, "skills": 1,
+        "numOfQns": 1,
+        "stipendMin": 1, "stipendMax": 1, "lastDateDay": 1,
+        "skillIds": 1, "categoryId": 1, "categoryVersion": 1,
+        "locationName": 1, "location": 1,
+        "score": {"$meta": "vectorSearchScore"}
+    }
+}
+
+
+def projection():
+    """MMR needs the candidate embeddings, so they come back with the
+    vector search instead of being fetched again."""
+    if not Config.RECOMMEND_MMR:
+        return PROJECTION
+    return {"$project": dict(PROJECTION["$project"], embedding=1)}
+
+
+def build_pipeline(user_vector, filters, prefilter=False):
+    if prefilter:
+        return build_prefiltered_pipeline(user_vector, filters)
 
     match_conditions = {}
 
@@ -36,20 +67,13 @@ def recommend(data):
     elif jobtype_filters:
         match_conditions["jobType"] = {"$in": jobtype_filters}
 
-    stipend_filters = []
-    if filters.get("stipend"):
-        for s in filters["stipend"]:
-            r = parse_filter_stipend_range(str(s))
-            if r:
-                stipend_filters.append(r)
-
     pipeline = [
         {
             "$vectorSearch": {
                 "index": "vector_index",
                 "path": "embedding",
                 "queryVector": user_vector,
-                "numCandidates": 500,
+                "numCandidates": Config.RECOMMEND_NUM_CANDIDATES,
                 "limit": 200
             }
         }
@@ -58,182 +82,489 @@ def recommend(data):
     if match_conditions:
         pipeline.append({"$match": match_conditions})
 
-    pipeline.append({
-        "$project": {
-            "_id": 1,
-            "jobTitle": 1, "company": 1, "description": 1,
-            "jobRole": 1, "jobTopic": 1,
-            "duration": 1, "type": 1,
-            "stipend": 1, "jobType": 1,
-            "lastDate": 1, "skills": 1,
-            "numOfQns": 1,
-            "locationName": 1, "location": 1,
-            "score": {"$meta": "vectorSearchScore"}
-        }
-    })
+    pipeline.append(projection())
 
-    try:
-        candidates = list(collection.aggregate(pipeline))
-    except Exception as e:
-        return {"error": f"Database query failed: {e}"}, 500
+    return pipeline
 
-    if not candidates:
-        return []
 
+def build_prefiltered_pipeline(user_vector, filters):
+    """Filters applied inside $vectorSearch, so the 200 neighbours all pass
+    them and fewer candidates need to be scanned."""
+    search = {
+        "index": "vector_index",
+        "path": "embedding",
+        "queryVector": user_vector,
+        "numCandidates": Config.RECOMMEND_PREFILTER_NUM_CANDIDATES,
+        "limit": 200
+    }
+
+    search_filter = vector_search_filter(filters)
+    if search_filter:
+        search["filter"] = search_filter
+
+    return [{"$vectorSearch": search}, projection()]
+
+
+
+def parse_request(data):
+    """Returns (request fields, None) or (None, error response)."""
+    user_vector = data.get("embedding")
+
+    if not user_vector or not isinstance(user_vector, list):
+        return None, ({"error": "Invalid input. Provide 'embedding' as a list of floats."}, 400)
+
+    filters = data.get("filters", {})
+    if Config.RECOMMEND_HIDE_EXPIRED:
+        filters = dict(filters, available=["open"])
+
+    backend = data.get("backend") or Config.RECOMMEND_BACKEND
+
+    return {
+        "user_vector": user_vector,
+        "filters": filters,
+        "resume_summary": data.get("resumeSummary", "").lower(),
+        "backend": backend,
+        "prefilter": Config.RECOMMEND_PREFILTER and backend != "local"
+    }, None
+
+
+def filter_by_location(candidates, location_filters, target_coords):
+    if not location_filters or not target_coords:
+        return candidates
+
+    points = np.array([point_coordinates(c) for c in candidates], dtype=float)
+    names = np.array([c.get("locationName") for c in candidates], dtype=object)
+
+    has_coords = ~np.isnan(points[:, 0])
+    nearby = np.isin(names, location_filters) | within_radius(points, target_coords, 500)
+    mask = has_coords & nearby
+
+    if mask.any():
+        return [c for c, keep in zip(candidates, mask) if keep]
+
+    return candidates
+
+
+def filter_by_meta(candidates, filters, req):
+    if req["backend"] == "local" or req["prefilter"]:
+        # the local index or the $vectorSearch filter already applied them
+        return candidates
+
+    if not parse_stipend_filters(filters.get("stipend")) and not wants_open_only(filters):
+        return candidates
+
+    mask = meta_mask(meta_columns(candidates), filters)
+    return [c for c, keep in zip(candidates, mask) if keep]
 
+
+def filter_relevant(candidates, user_category):
+    """Keeps candidates in one of the user's nearest categories; postings
+    not yet classified, or classified by another model version, pass.
+    Falls back to every candidate when none match or no category model has
+    been fit."""
+    if not user_category:
+        return candidates
+
+    version, categories = user_category
+    ids = np.array([c.get("categoryId") for c in candidates], dtype=float)
+    stale = np.array([posting_version(c) != version for c in candidates])
+    mask = np.isin(ids, categories) | np.isnan(ids) | stale
+
+    if mask.any():
+        return [c for c, keep in zip(candidates, mask) if keep]
+
+    return candidates
+
+
+def rerank_documents(candidates):
+    return [
+        f"{c.get('jobTitle','')} "
+        f"{c.get('jobRole','')} "
+        f"{c.get('jobTopic','')} "
+        f"{c.get('description','')}"
+        for c in candidates
+    ]
+
+
+def stage_one_scores(candidates, resume_summary):
+    """Vector score plus skill overlap: the hybrid score without the cross
+    score, cheap enough for every candidate."""
+    vector_scores = np.array([c.get("score", 0) for c in candidates])
+
+    # the summary is tokenized into skill ids once per request
+    resume_ids = get_skill_vocabulary().text_ids(resume_summary)
+    skill_scores = skill_overlap(candidates, resume_ids)
+
+    return 0.4 * vector_scores + 0.2 * skill_scores
+
+
+def diversity_key(candidate):
+    return (candidate.get("company"), candidate.get("jobRole"))
+
+
+def score_and_diversify(candidates, cross_scores, resume_summary, stage_one=None):
+    """Hybrid-scored candidates, best first, with one result per (company,
+    jobRole)."""
+    if stage_one is None:
+        stage_one = stage_one_scores(candidates, resume_summary)
+
+    final_scores = stage_one + 0.4 * cross_scores
+
+    ranked = [
+        dict(c, rerank_score=float(score))
+        for c, score in zip(candidates, final_scores)
+    ]
+
+    ranked.sort(key=lambda x: x["rerank_score"], reverse=True)
+
+    seen = set()
+    diversified = []
+
+    for item in ranked:
+        key = diversity_key(item)
+        if key not in seen:
+            diversified.append(item)
+            seen.add(key)
+
+    return diversified
+
+
+def mmr_rerank(items):
+    """Reorders the top MMR_TOP_K items by maximal marginal relevance over
+    their embeddings; the rest keep their score order."""
+    head = items[:Config.MMR_TOP_K]
+
+    if len(head) < 2 or any(item.get("embedding") is None for item in head):
+        return items
+
+    with stage("recommend.mmr", len(head)):
+        order = mmr_order(
+            np.array([item["rerank_score"] for item in head]),
+            np.array([item["embedding"] for item in head], dtype=np.float32),
+            Config.MMR_LAMBDA
+        )
+
+    return [head[i] for i in order] + items[len(head):]
+
+
+def plan_rerank(candidates, resume_summary):
+    """Stage 1 of the cascade: (stage-1 scores, indices to rerank, early exit)."""
+    stage_one = stage_one_scores(candidates, resume_summary)
+    head, early_exit = rerank_depth(stage_one, [diversity_key(c) for c in candidates], DEFAULT_RESULTS)
+    return stage_one, head, early_exit
+
+
+def prepare_rerank(candidates, req, target_coords):
+    """The post-retrieval steps shared by both serving modes: location,
+    meta and relevance filters, then stage 1 of the cascade. Returns
+    (candidates, stage-1 scores, indices to rerank, early exit), or None
+    when no candidate is left."""
+    filters = req["filters"]
     location_filters = filters.get("location", [])
 
     if location_filters:
-        loc_docs = list(collection.find(
-            {"locationName": {"$in": location_filters}},
-            {"location": 1}
-        ))
+        with stage("recommend.location_filter", len(candidates)) as span:
+            candidates = filter_by_location(candidates, location_filters, target_coords)
+            span.out(len(candidates))
 
-        target_coords = [
-            doc["location"]["coordinates"]
-            for doc in loc_docs if doc.get("location")
-        ]
+    with stage("recommend.meta_filter", len(candidates)) as span:
+        candidates = filter_by_meta(candidates, filters, req)
+        span.out(len(candidates))
 
-        if target_coords:
-            filtered = []
+    if not candidates:
+        return None
 
-            for cand in candidates:
-                coords = cand.get("location", {}).get("coordinates")
-                if not coords:
-                    continue
+    with stage("recommend.relevance_filter", len(candidates)) as span:
+        candidates = filter_relevant(candidates, user_categories(req["user_vector"], candidates))
+        span.out(len(candidates))
 
-                if cand.get("locationName") in location_filters:
-                    filtered.append(cand)
-                    continue
+    with stage("recommend.cascade", len(candidates)) as span:
+        stage_one, head, early_exit = plan_rerank(candidates, req["resume_summary"])
+        span.out(len(head))
 
-                for tc in target_coords:
-                    if haversine(tc, coords) <= 500:
-                        filtered.append(cand)
-                        break
+    return candidates, stage_one, head, early_exit
 
-            if filtered:
-                candidates = filtered
 
+def finish_cascade(candidates, stage_one, head, early_exit, head_scores, resume_summary):
+    """Stage 2: hybrid ranking with the cross scores of the reranked head,
+    recording whether the reranker changed the top results. MMR runs after
+    the stats are recorded, so they compare the two rankings alone."""
+    with stage("recommend.score", len(candidates)) as span:
+        cross_scores = fill_cross_scores(len(candidates), head, head_scores)
+        ranked = score_and_diversify(candidates, cross_scores, resume_summary, stage_one=stage_one)
 
-    filtered_after_meta = []
+        cascade_stats.record(
+            len(candidates), len(head), early_exit,
+            top_ids(candidates, stage_one), [str(item["_id"]) for item in ranked[:DEFAULT_RESULTS]]
+        )
 
-    available_open = False
-    if filters.get("available"):
-        if "open" in [x.lower() for x in filters["available"]]:
-            available_open = True
+        # exact (company, jobRole) duplicates are already dropped; MMR
+        # spreads out near-duplicates among the rest
+        if Config.RECOMMEND_MMR:
+            ranked = mmr_rerank(ranked)
 
-    for cand in candidates:
-        ok = True
+        for item in ranked:
+            format_result(item)
 
-        if stipend_filters:
-            val = parse_stipend_to_number(cand.get("stipend"))
-            if val is None:
-                ok = False
-            else:
-                ok = any(mn <= val <= mx for (mn, mx) in stipend_filters)
+        span.out(len(ranked))
 
-        if ok and available_open:
-            if not last_date_is_open(cand.get("lastDate")):
-                ok = False
+    return ranked
 
-        if ok:
-            filtered_after_meta.append(cand)
 
-    if not filtered_after_meta:
-        return []
+def top_ids(candidates, scores):
+    """Ids of the diversified top results if candidates were ranked by `scores`."""
+    seen = set()
+    ids = []
 
+    for i in np.argsort(-scores, kind="stable"):
+        key = diversity_key(candidates[i])
+        if key not in seen:
+            seen.add(key)
+            ids.append(str(candidates[i]["_id"]))
+        if len(ids) >= DEFAULT_RESULTS:
+            break
 
-    def is_relevant_job(job):
-        text = f"{job.get('jobTitle','')} {job.get('jobRole','')} {job.get('jobTopic','')}".lower()
+    return ids
 
-        if "teaching" in resume_summary:
-            return any(k in text for k in ["teacher", "teaching", "tutor", "education"])
 
-        if "software" in resume_summary or "development" in resume_summary:
-            return any(k in text for k in ["developer", "software", "engineer", "web"])
+def format_result(item):
+    item["_id"] = str(item["_id"])
+    item.pop("location", None)
+    item.pop("skillIds", None)
+    item.pop("embedding", None)
 
-        if "marketing" in resume_summary:
-            return any(k in text for k in ["marketing", "seo", "campaign"])
+    skills = item.get("skills", [])
+    if isinstance(skills, str):
+        item["skills"] = [s.strip() for s in skills.split(",") if s.strip()]
+    elif isinstance(skills, list):
+        item["skills"] = skills
+    else:
+        item["skills"] = []
 
-        return True
+    topics = item.get("jobTopic", "")
+    if isinstance(topics, str):
+        item["jobTopic"] = [t.strip() for t in topics.split(",") if t.strip()]
+    elif isinstance(topics, list):
+        item["jobTopic"] = topics
+    else:
+        item["jobTopic"] = []
 
-    temp_filtered = [c for c in filtered_after_meta if is_relevant_job(c)]
-    if temp_filtered:
-        filtered_after_meta = temp_filtered
+    return item
 
 
+def request_key(req):
+    return result_key(req["user_vector"], req["filters"], req["resume_summary"], req["backend"])
+
+
+def page_size(data):
     try:
-        documents = [
-            f"{c.get('jobTitle','')} "
-            f"{c.get('jobRole','')} "
-            f"{c.get('jobTopic','')} "
-            f"{c.get('description','')}"
-            for c in filtered_after_meta
-        ]
-
-        results = rerank(
-            query=resume_summary,
-            documents=documents
-        )
+        size = int(data.get("pageSize") or DEFAULT_RESULTS)
+    except (TypeError, ValueError):
+        size = DEFAULT_RESULTS
 
-        cross_scores = np.array([
-            r["relevance_score"] for r in results
-        ])
-        vector_scores = np.array([c.get("score", 0) for c in filtered_after_meta])
+    return max(1, min(size, Config.RECOMMEND_MAX_PAGE_SIZE))
 
-        skill_scores = []
-        for c in filtered_after_meta:
-            job_skills = " ".join(c.get("skills", [])).lower()
-            overlap = sum(1 for skill in job_skills.split() if skill in resume_summary)
-            skill_scores.append(overlap)
 
-        skill_scores = np.array(skill_scores)
+def wants_pages(data):
+    return "pageSize" in data or "cursor" in data
 
-        final_scores = (
-            0.4 * vector_scores +
-            0.4 * cross_scores +
-            0.2 * skill_scores
-        )
 
-        ranked = [
-            dict(c, rerank_score=float(score))
-            for c, score in zip(filtered_after_meta, final_scores)
-        ]
+def paginate(data, ranked):
+    """Default responses stay the plain top-10 list; callers sending
+    `pageSize` get {"results", "nextCursor", "total"} instead."""
+    if isinstance(ranked, tuple):
+        return ranked
 
-        ranked.sort(key=lambda x: x["rerank_score"], reverse=True)
+    if not wants_pages(data):
+        return ranked[:DEFAULT_RESULTS]
 
-        seen = set()
-        diversified = []
+    return get_page_store().first_page(ranked, page_size(data))
 
-        for item in ranked:
-            key = (item.get("company"), item.get("jobRole"))
-            if key not in seen:
-                diversified.append(item)
-                seen.add(key)
-            if len(diversified) >= 10:
-                break
-
-        for item in diversified:
-            item["_id"] = str(item["_id"])
-            item.pop("location", None)
-
-            skills = item.get("skills", [])
-            if isinstance(skills, str):
-                item["skills"] = [s.strip() for s in skills.split(",") if s.strip()]
-            elif isinstance(skills, list):
-                item["skills"] = skills
+
+def next_page(data):
+    page = get_page_store().next_page(data["cursor"], page_size(data))
+
+    if page is None:
+        return {"error": "Cursor expired or unknown. Request the first page again."}, 410
+
+    return page
+
+
+def recommend(data):
+    if data and data.get("cursor"):
+        return next_page(data)
+
+    return paginate(data, ranked_recommendations(data))
+
+
+def ndjson_lines(items):
+    for item in items:
+        yield json.dumps(item, default=str) + "\n"
+
+
+def stream_recommendations(data):
+    """(NDJSON line iterator, None) or (None, error response). Ranking needs
+    every cross score, so lines start once the list is ranked; the top
+    results are flushed before the rest of the list is serialized."""
+    ranked = ranked_recommendations(data)
+    if isinstance(ranked, tuple):
+        return None, ranked
+
+    return ndjson_lines(ranked), None
+
+
+def ranked_recommendations(data):
+    """The full ranked, diversified list for a request (or an error
+    response), served from the result cache when possible."""
+    collection = get_collection()
+
+    if collection is None:
+        return {"error": "Server is not ready due to a startup failure."}, 503
+
+    req, error = parse_request(data)
+    if error:
+        return error
+
+    cache = get_result_cache()
+    if cache is None:
+        return compute_recommendations(collection, req)
+
+    key = request_key(req)
+    with stage("recommend.cache_lookup"):
+        result = cache.get(key)
+    if result is not None:
+        return result
+
+    result = compute_recommendations(collection, req)
+
+    # errors are not cached, so a failed rerank is retried on the next request
+    if isinstance(result, list):
+        cache.put(key, result)
+
+    return result
+
+
+def compute_recommendations(collection, req):
+    filters = req["filters"]
+    resume_summary = req["resume_summary"]
+
+    try:
+        with stage("recommend.vector_search") as span:
+            if req["backend"] == "local":
+                candidates = get_local_index().search(
+                    req["user_vector"], limit=200, filters=filters, with_embeddings=Config.RECOMMEND_MMR
+                )
             else:
-                item["skills"] = []
+                candidates = list(collection.aggregate(build_pipeline(req["user_vector"], filters, req["prefilter"])))
+            span.out(len(candidates))
+    except Exception as e:
+        return {"error": f"Database query failed: {e}"}, 500
+
+    if not candidates:
+        return []
+
+    location_filters = filters.get("location", [])
+    target_coords = []
+    if location_filters:
+        with stage("recommend.location_lookup"):
+            target_coords = get_city_lookup().coordinates_for(location_filters)
+
+    plan = prepare_rerank(candidates, req, target_coords)
+    if plan is None:
+        return []
+    candidates, stage_one, head, early_exit = plan
+
+    try:
+        with stage("recommend.rerank", len(head)):
+            head_scores = rerank_scores(
+                query=resume_summary,
+                documents=rerank_documents([candidates[i] for i in head])
+            )
+
+        return finish_cascade(candidates, stage_one, head, early_exit, head_scores, resume_summary)
+
+    except Exception as e:
+        return {"error": f"Hybrid re-ranking failed: {e}"}, 500
+
+
+async def recommend_async(data):
+    """recommend() for the ASGI app: the vector search and the location
+    lookup run concurrently on non-blocking clients."""
+    if data and data.get("cursor"):
+        return await asyncio.to_thread(next_page, data)
+
+    ranked = await ranked_recommendations_async(data)
+
+    return await asyncio.to_thread(paginate, data, ranked)
+
+
+async def ranked_recommendations_async(data):
+    req, error = parse_request(data)
+    if error:
+        return error
+
+    cache = get_result_cache()
+    if cache is None:
+        return await compute_recommendations_async(req)
+
+    key = request_key(req)
+    with stage("recommend.cache_lookup"):
+        result = await asyncio.to_thread(cache.get, key)
+    if result is not None:
+        return result
 
-            topics = item.get("jobTopic", "")
-            if isinstance(topics, str):
-                item["jobTopic"] = [t.strip() for t in topics.split(",") if t.strip()]
-            elif isinstance(topics, list):
-                item["jobTopic"] = topics
+    result = await compute_recommendations_async(req)
+
+    if isinstance(result, list):
+        await asyncio.to_thread(cache.put, key, result)
+
+    return result
+
+
+async def compute_recommendations_async(req):
+    filters = req["filters"]
+    resume_summary = req["resume_summary"]
+    location_filters = filters.get("location", [])
+
+    async def fetch_candidates():
+        with stage("recommend.vector_search") as span:
+            if req["backend"] == "local":
+                candidates = await asyncio.to_thread(
+                    get_local_index().search, req["user_vector"], 200, filters, Config.RECOMMEND_MMR
+                )
             else:
-                item["jobTopic"] = []
+                cursor = await get_async_collection().aggregate(build_pipeline(req["user_vector"], filters, req["prefilter"]))
+                candidates = await cursor.to_list(length=None)
+            span.out(len(candidates))
+            return candidates
+
+    async def fetch_target_coords():
+        if not location_filters:
+            return []
+        with stage("recommend.location_lookup"):
+            return await asyncio.to_thread(get_city_lookup().coordinates_for, location_filters)
+
+    try:
+        candidates, target_coords = await asyncio.gather(fetch_candidates(), fetch_target_coords())
+    except Exception as e:
+        return {"error": f"Database query failed: {e}"}, 500
+
+    if not candidates:
+        return []
+
+    plan = prepare_rerank(candidates, req, target_coords)
+    if plan is None:
+        return []
+    candidates, stage_one, head, early_exit = plan
+
+    try:
+        with stage("recommend.rerank", len(head)):
+            head_scores = await rerank_scores_async(
+                query=resume_summary,
+                documents=rerank_documents([candidates[i] for i in head])
+            )
 
-        return diversified
+        return finish_cascade(candidates, stage_one, head, early_exit, head_scores, resume_summary)
 
     except Exception as e:
-        return {"error": f"Hybrid re-ranking failed: {e}"}, 500
\ No newline at end of file
+        return {"error": f"Hybrid re-ranking failed: {e}"}, 500
@@ -1,27 +1,194 @@
 import os
+import asyncio
+import hashlib
+import threading
+import httpx
 import requests
+import numpy as np
 from dotenv import load_dotenv
+from config.config import Config
+from services.result_cache import ResultCache
+from utils.tracing import stage
 
 load_dotenv()
 
 URL = "https://api.jina.ai/v1/rerank"
 
+JINA_MODEL = "jina-reranker-v2-base-multilingual"
+
 JINA_API_KEY = os.getenv("JINA_API_KEY")
 
+session = requests.Session()
+
+# created on first use so it binds to the ASGI app's event loop
+async_client = None
+
+_local_lock = threading.Lock()
+
+score_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_score_cache():
+    """TTL + LRU of (query, document) relevance scores, or None when
+    RERANK_CACHE_ENABLED is off."""
+    global score_cache
+
+    if not Config.RERANK_CACHE_ENABLED:
+        return None
+
+    if score_cache is None:
+        with _cache_lock:
+            if score_cache is None:
+                score_cache = ResultCache(Config.RERANK_CACHE_MAX_ENTRIES, Config.RERANK_CACHE_TTL_SECONDS)
+
+    return score_cache
+
+
+def pair_key(backend, query, document):
+    model = f"{Config.CROSS_ENCODER_MODEL}:{Config.RERANK_MAX_LENGTH}" if backend == "local" else JINA_MODEL
+    return hashlib.sha256(f"{model}\0{query}\0{document}".encode("utf-8")).hexdigest()
+
+
+def split_cached(query, documents, backend):
+    """Scores array with cached pairs filled in, the keys per document, and
+    the positions still to rerank, one per distinct document."""
+    cache = get_score_cache()
+    scores = np.zeros(len(documents))
+    keys = [pair_key(backend, query, doc) for doc in documents]
+    missing = {}
+
+    for i, key in enumerate(keys):
+        if key in missing:
+            continue
+        score = cache.get(key)
+        if score is None:
+            missing[key] = i
+        else:
+            scores[i] = score
+
+    return scores, keys, list(missing.values())
+
+
+def merge_scores(scores, keys, positions, results):
+    """Writes fresh reranker results (indexed into the missing positions)
+    into `scores`, caches them, and copies them to duplicate documents."""
+    cache = get_score_cache()
+    fresh = {}
+
+    for r in results:
+        key = keys[positions[r["index"]]]
+        fresh[key] = r["relevance_score"]
+        cache.put(key, r["relevance_score"])
+
+    for i, key in enumerate(keys):
+        if key in fresh:
+            scores[i] = fresh[key]
+
+    return scores
+
+
+def rerank(query, documents, backend=None):
+    """Returns [{"index", "relevance_score"}] sorted by score, like the Jina API."""
+    backend = backend or Config.RERANKER_BACKEND
+
+    with stage(f"rerank.{backend}", len(documents)):
+        if backend == "local":
+            return rerank_local(query, documents)
+
+        return rerank_jina(query, documents)
+
+
+def rerank_scores(query, documents, backend=None, use_cache=True):
+    """Relevance scores aligned with `documents` order. Pairs scored before
+    are served from the score cache; only the rest go to the reranker."""
+    backend = backend or Config.RERANKER_BACKEND
+
+    if not use_cache or get_score_cache() is None:
+        scores = np.zeros(len(documents))
+        for r in rerank(query, documents, backend=backend):
+            scores[r["index"]] = r["relevance_score"]
+        return scores
+
+    with stage("rerank.cache", len(documents)) as span:
+        scores, keys, missing = split_cached(query, documents, backend)
+        span.out(len(missing))
+    if not missing:
+        return scores
+
+    results = rerank(query, [documents[i] for i in missing], backend=backend)
+
+    return merge_scores(scores, keys, missing, results)
+
+
+async def rerank_async(query, documents, backend=None):
+    backend = backend or Config.RERANKER_BACKEND
 
-def rerank(query, documents):
+    with stage(f"rerank.{backend}", len(documents)):
+        if backend == "local":
+            return await asyncio.to_thread(rerank_local, query, documents)
+
+        return await rerank_jina_async(query, documents)
+
+
+async def rerank_scores_async(query, documents, backend=None, use_cache=True):
+    backend = backend or Config.RERANKER_BACKEND
+
+    if not use_cache or get_score_cache() is None:
+        scores = np.zeros(len(documents))
+        for r in await rerank_async(query, documents, backend=backend):
+            scores[r["index"]] = r["relevance_score"]
+        return scores
+
+    with stage("rerank.cache", len(documents)) as span:
+        scores, keys, missing = split_cached(query, documents, backend)
+        span.out(len(missing))
+    if not missing:
+        return scores
+
+    results = await rerank_async(query, [documents[i] for i in missing], backend=backend)
+
+    return merge_scores(scores, keys, missing, results)
+
+
+def jina_request(query, documents):
     headers = {
         "Authorization": f"Bearer {JINA_API_KEY}",
         "Content-Type": "application/json"
     }
 
     payload = {
-        "model": "jina-reranker-v2-base-multilingual",
+        "model": JINA_MODEL,
         "query": query,
         "documents": documents
     }
 
-    response = requests.post(
+    return headers, payload
+
+
+def rerank_jina(query, documents):
+    headers, payload = jina_request(query, documents)
+
+    response = session.post(
+        URL,
+        headers=headers,
+        json=payload
+    )
+
+    response.raise_for_status()
+
+    return response.json()["results"]
+
+
+async def rerank_jina_async(query, documents):
+    global async_client
+
+    if async_client is None:
+        async_client = httpx.AsyncClient(timeout=None)
+
+    headers, payload = jina_request(query, documents)
+
+    response = await async_client.post(
         URL,
         headers=headers,
         json=payload
@@ -31,3 +198,27 @@ def rerank(query, documents):
 
     return response.json()["results"]
 
+
+def rerank_local(query, documents):
+    # imported here so the Jina backend never pays for loading torch
+    from models.ml_model import get_cross_encoder
+
+    if not documents:
+        return []
+
+    with _local_lock:
+        model = get_cross_encoder()
+
+    scores = model.predict(
+        [(query, doc) for doc in documents],
+        batch_size=Config.RERANK_BATCH_SIZE,
+        show_progress_bar=False
+    )
+
+    results = [
+        {"index": i, "relevance_score": float(score)}
+        for i, score in enumerate(scores)
+    ]
+    results.sort(key=lambda x: x["relevance_score"], reverse=True)
+
+    return results
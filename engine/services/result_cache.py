@@ -0,0 +1,198 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from config.config import Config
+from db.mongo import get_collection
+
+
+def canonical(value):
+    """Filters in a stable form: dict keys sorted by json.dumps, and lists of
+    plain values sorted so ["Delhi", "Pune"] and ["Pune", "Delhi"] match."""
+    if isinstance(value, dict):
+        return {k: canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [canonical(v) for v in value]
+        if all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in items):
+            return sorted(items, key=lambda v: (type(v).__name__, v))
+        return items
+    return value
+
+
+def result_key(user_vector, filters, resume_summary, backend, precision=None):
+    """Fingerprint of a /recommend request. The embedding is rounded to
+    RESULT_CACHE_PRECISION decimals so float noise from re-encoding the same
+    resume does not defeat the cache."""
+    precision = Config.RESULT_CACHE_PRECISION if precision is None else precision
+
+    quantized = np.round(np.asarray(user_vector, dtype=np.float64) * 10 ** precision).astype(np.int64)
+
+    digest = hashlib.sha256()
+    digest.update(quantized.tobytes())
+    digest.update(json.dumps(canonical(filters or {}), sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    digest.update(b"\0" + str(resume_summary).encode("utf-8"))
+    digest.update(b"\0" + str(backend).encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Per-process TTL + LRU cache of /recommend responses."""
+
+    backend = "memory"
+
+    def __init__(self, max_entries, ttl_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.watcher = None
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self.entries[key]
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        with self.lock:
+            self.entries.clear()
+            self.invalidations += 1
+
+    def size(self):
+        with self.lock:
+            return len(self.entries)
+
+    def start_watcher(self, collection):
+        """Drops every cached response on any write to the internship
+        collection. Needs a replica set (Atlas); without one the TTL bounds
+        staleness."""
+        if self.watcher is not None:
+            return
+
+        def watch():
+            try:
+                with collection.watch() as stream:
+                    for _ in stream:
+                        self.invalidate()
+            except Exception as e:
+                print("Result cache change stream stopped:", e)
+            self.watcher = None
+
+        self.watcher = threading.Thread(target=watch, daemon=True)
+        self.watcher.start()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            counters = {
+                "backend": self.backend,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+        counters["entries"] = self.size()
+        return counters
+
+
+class RedisResultCache(ResultCache):
+    """Same cache shared by every worker through Redis. Invalidation bumps a
+    generation counter that is part of every key, so old entries stop
+    matching at once and expire on their TTL. Hit/miss counters stay per
+    process."""
+
+    backend = "redis"
+
+    def __init__(self, url, ttl_seconds, prefix="recommend"):
+        super().__init__(0, ttl_seconds)
+
+        import redis
+
+        self.redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _generation(self):
+        return int(self.redis.get(f"{self.prefix}:gen") or 0)
+
+    def get(self, key):
+        raw = self.redis.get(f"{self.prefix}:{self._generation()}:{key}")
+
+        with self.lock:
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return json.loads(raw)
+
+    def put(self, key, value):
+        self.redis.setex(
+            f"{self.prefix}:{self._generation()}:{key}",
+            self.ttl_seconds,
+            json.dumps(value, default=str)
+        )
+
+    def invalidate(self):
+        self.redis.incr(f"{self.prefix}:gen")
+
+        with self.lock:
+            self.invalidations += 1
+
+    def size(self):
+        return None
+
+
+result_cache = None
+_init_lock = threading.Lock()
+
+
+def get_result_cache():
+    """The configured /recommend cache, or None when RESULT_CACHE_ENABLED is off."""
+    global result_cache
+
+    if not Config.RESULT_CACHE_ENABLED:
+        return None
+
+    if result_cache is None:
+        with _init_lock:
+            if result_cache is None:
+                if Config.RESULT_CACHE_REDIS_URL:
+                    cache = RedisResultCache(Config.RESULT_CACHE_REDIS_URL, Config.RESULT_CACHE_TTL_SECONDS)
+                else:
+                    cache = ResultCache(Config.RESULT_CACHE_MAX_ENTRIES, Config.RESULT_CACHE_TTL_SECONDS)
+
+                if Config.RESULT_CACHE_WATCH:
+                    cache.start_watcher(get_collection())
+
+                result_cache = cache
+
+    return result_cache
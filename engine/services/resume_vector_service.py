@@ -1,61 +1,195 @@
 import os
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from huggingface_hub import InferenceClient
+from config.config import Config
+from services.embedding_dispatcher import get_dispatcher
 from services.pinecone_service import get_index
 
 load_dotenv()
 
-client = InferenceClient(api_key=os.getenv("HF_TOKEN"))
+dispatcher = get_dispatcher(os.getenv("HF_TOKEN"))
 
-MODEL = "BAAI/bge-large-en-v1.5"
 
+def chunk_text(text, chunk_size=120, min_size=40):
+    """Content-defined chunks: lines (build_resume_text writes one entry per
+    line) are packed into chunks of up to `chunk_size` words, and a chunk
+    may also end after any line whose hash marks a boundary once it has
+    `min_size` words. Boundaries depend only on nearby lines, so editing one
+    entry changes one or two chunks instead of shifting every later one.
+    Each chunk starts with the last line of the previous one for context."""
+    pieces = []
+    for line in text.splitlines():
+        words = line.split()
+        # a line longer than a chunk is split into windows of its own
+        for start in range(0, len(words), chunk_size):
+            pieces.append(words[start:start + chunk_size])
 
-def chunk_text(text, chunk_size=120, overlap=30):
-    words = text.split()
     chunks = []
+    current = []
+    tail = []
 
-    for i in range(0, len(words), chunk_size - overlap):
-        chunk = " ".join(words[i:i + chunk_size])
-        chunks.append(chunk)
+    for words in pieces:
+        if current and len(current) + len(words) > chunk_size:
+            chunks.append(current)
+            tail, current = last, []
 
-    return chunks
+        if not current and len(tail) + len(words) <= chunk_size:
+            current = list(tail)
 
+        current.extend(words)
+        last = words
 
-def store_resume_chunks(user_id, resume_text, batch_size=20):
-    index = get_index()
+        if len(current) >= min_size and is_boundary(" ".join(words)):
+            chunks.append(current)
+            tail, current = words, []
 
-    chunks = chunk_text(resume_text)
-    total_chunks = len(chunks)
+    if current:
+        chunks.append(current)
 
-    for batch_start in range(0, total_chunks, batch_size):
-        batch_chunks = chunks[batch_start: batch_start + batch_size]
+    return [" ".join(chunk) for chunk in chunks]
 
-        vectors = []
 
-        for i, chunk in enumerate(batch_chunks):
-            embedding = client.feature_extraction(
-                chunk,
-                model=MODEL
-            ).tolist()
+def is_boundary(line):
+    return hashlib.sha256(line.encode("utf-8")).digest()[0] % 4 == 0
 
-            vectors.append({
-                "id": f"{user_id}_{batch_start + i}",
-                "values": embedding,
-                "metadata": {
-                    "userId": user_id,
-                    "text": chunk,
-                    "type": "resume"
-                }
-            })
 
+def chunk_hash(chunk):
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()[:16]
+
+
+def fetch_chunk_ids(index, namespace):
+    """Ids already stored in the user's namespace, or None when the index
+    cannot list them (index.list() only exists on serverless indexes)."""
+    try:
+        return {vector_id for page in index.list(namespace=namespace) for vector_id in page}
+    except Exception as e:
+        print(f"Cannot list vectors in '{namespace}' ({e}); re-embedding every chunk.")
+        return None
+
+
+def store_resume_chunks(user_id, resume_text, batch_size=20, on_progress=None, is_cancelled=None):
+    """Embeds each batch of chunks in one inference call, with up to
+    RESUME_EMBED_CONCURRENCY batches in flight, and upserts batch N while
+    later batches are still embedding.
+
+    Re-uploads are incremental: vector ids are "{user}_{content hash}", so
+    a chunk whose text did not change keeps its id and is skipped, whatever
+    its position; ids no longer in the resume are deleted. Indexes that
+    cannot list ids (pod-based) re-embed everything and drop stale chunks
+    with a metadata filter on the hash.
+
+    on_progress(stored, total) is called after every upsert; is_cancelled()
+    is checked before each batch is submitted and again right before its
+    upsert, so a superseded job stops early and writes nothing more."""
+    index = get_index()
+    namespace = str(user_id)
+    timings = {"embed_ms": 0.0, "upsert_ms": 0.0}
+    started = time.perf_counter()
+
+    # identical chunks share an id, so each distinct text is stored once
+    chunks = list(dict.fromkeys(chunk_text(resume_text)))
+    total_chunks = len(chunks)
+    hashes = [chunk_hash(chunk) for chunk in chunks]
+    ids = [f"{user_id}_{h}" for h in hashes]
+    timings["chunk_ms"] = (time.perf_counter() - started) * 1000
+
+    start = time.perf_counter()
+    existing = fetch_chunk_ids(index, namespace)
+    timings["diff_ms"] = (time.perf_counter() - start) * 1000
+
+    if existing is None:
+        changed = list(range(total_chunks))
+        orphaned = None
+    else:
+        changed = [n for n in range(total_chunks) if ids[n] not in existing]
+        id_set = set(ids)
+        orphaned = [vector_id for vector_id in existing if vector_id not in id_set]
+
+    batches = [
+        changed[batch_start: batch_start + batch_size]
+        for batch_start in range(0, len(changed), batch_size)
+    ]
+
+    def embed_batch(positions):
+        start = time.perf_counter()
+        embeddings = dispatcher.embed_many([chunks[n] for n in positions])
+        return embeddings, time.perf_counter() - start
+
+    stored = total_chunks - len(changed)
+    cancelled = False
+
+    def upsert_batch(vectors):
+        nonlocal stored, cancelled
+        # batches queued before the job was superseded must not land
+        if is_cancelled and is_cancelled():
+            cancelled = True
+            return 0.0
+
+        start = time.perf_counter()
         index.upsert(
             vectors=vectors,
-            namespace=str(user_id)
+            namespace=namespace
         )
+        stored += len(vectors)
+        if on_progress:
+            on_progress(stored, total_chunks)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=Config.RESUME_EMBED_CONCURRENCY) as embed_pool, \
+            ThreadPoolExecutor(max_workers=1) as upsert_pool:
+        embed_futures = [embed_pool.submit(embed_batch, positions) for positions in batches]
+        upsert_futures = []
+
+        for positions, future in zip(batches, embed_futures):
+            if is_cancelled and is_cancelled():
+                cancelled = True
+                for pending in embed_futures:
+                    pending.cancel()
+                break
+
+            embeddings, embed_seconds = future.result()
+            timings["embed_ms"] += embed_seconds * 1000
+
+            vectors = [
+                {
+                    "id": ids[n],
+                    "values": embedding,
+                    "metadata": {
+                        "userId": user_id,
+                        "text": chunks[n],
+                        "type": "resume",
+                        "hash": hashes[n],
+                        "position": n
+                    }
+                }
+                for n, embedding in zip(positions, embeddings)
+            ]
+
+            upsert_futures.append(upsert_pool.submit(upsert_batch, vectors))
+
+        for n, future in enumerate(upsert_futures, start=1):
+            timings["upsert_ms"] += future.result() * 1000
+            print(f"Batch {n} complete")
+
+    if orphaned and not cancelled:
+        start = time.perf_counter()
+        index.delete(ids=orphaned, namespace=namespace)
+        timings["delete_ms"] = (time.perf_counter() - start) * 1000
+    elif orphaned is None and not cancelled:
+        start = time.perf_counter()
+        index.delete(filter={"hash": {"$nin": hashes}}, namespace=namespace)
+        timings["delete_ms"] = (time.perf_counter() - start) * 1000
 
-        batch_number = (batch_start // batch_size) + 1
-        print(f"Batch {batch_number} complete")
+    timings["total_ms"] = (time.perf_counter() - started) * 1000
 
     return {
-        "stored_chunks": total_chunks
-    }
\ No newline at end of file
+        "stored_chunks": stored,
+        "total_chunks": total_chunks,
+        "embedded_chunks": len(changed),
+        "unchanged_chunks": total_chunks - len(changed),
+        "deleted_chunks": len(orphaned) if orphaned and not cancelled else 0,
+        "cancelled": cancelled,
+        "timings": {k: round(v, 1) for k, v in timings.items()}
+    }
@@ -1,22 +1,18 @@
 import os
+import asyncio
 from dotenv import load_dotenv
-from huggingface_hub import InferenceClient
+from services.embedding_dispatcher import get_dispatcher
 from services.pinecone_service import get_index
 
 load_dotenv()
 
-client = InferenceClient(api_key=os.getenv("HF_TOKEN"))
-
-MODEL = "BAAI/bge-large-en-v1.5"
+dispatcher = get_dispatcher(os.getenv("HF_TOKEN"))
 
 
 def retrieve_resume_chunks(user_id, query, top_k=3):
     index = get_index()
 
-    query_vector = client.feature_extraction(
-        query,
-        model=MODEL
-    ).tolist()
+    query_vector = dispatcher.embed(query)
 
     results = index.query(
         vector=query_vector,
@@ -30,4 +26,22 @@ def retrieve_resume_chunks(user_id, query, top_k=3):
         for match in results["matches"]
     ]
 
-    return chunks
\ No newline at end of file
+    return chunks
+
+
+async def retrieve_resume_chunks_async(user_id, query, top_k=3):
+    query_vector = await dispatcher.embed_async(query)
+
+    # the Pinecone client is synchronous, so the query runs off the event loop
+    results = await asyncio.to_thread(
+        get_index().query,
+        vector=query_vector,
+        top_k=top_k,
+        namespace=str(user_id),
+        include_metadata=True
+    )
+
+    return [
+        match["metadata"]["text"]
+        for match in results["matches"]
+    ]
\ No newline at end of file
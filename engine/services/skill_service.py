@@ -0,0 +1,93 @@
+import threading
+import numpy as np
+from config.config import Config
+from db.mongo import get_db
+from utils.skills import SkillVocabulary, posting_skills
+
+VOCABULARY_ID = "internships"
+
+skill_vocabulary = None
+_init_lock = threading.Lock()
+# only /embed grows the loaded vocabulary; queries read it without copying
+_update_lock = threading.Lock()
+
+
+def vocabulary_collection():
+    return get_db()[Config.SKILL_VOCABULARY_COLLECTION]
+
+
+def get_skill_vocabulary():
+    """The vocabulary written by ingest_data.py / build_skill_vocabulary.py,
+    loaded once per process. An empty one still scores, by matching every
+    resume n-gram."""
+    global skill_vocabulary
+
+    if skill_vocabulary is None:
+        with _init_lock:
+            if skill_vocabulary is None:
+                try:
+                    doc = vocabulary_collection().find_one({"_id": VOCABULARY_ID})
+                except Exception as e:
+                    print("Skill vocabulary unavailable:", e)
+                    doc = None
+                skill_vocabulary = SkillVocabulary.from_document(doc)
+
+    return skill_vocabulary
+
+
+def reload_skill_vocabulary():
+    global skill_vocabulary
+
+    with _init_lock:
+        skill_vocabulary = None
+
+    return get_skill_vocabulary()
+
+
+def posting_skill_ids(doc):
+    """Skill ids of a new posting (for /embed). Skills the vocabulary has
+    not seen are added to it and persisted."""
+    vocabulary = get_skill_vocabulary()
+    names = posting_skills(doc)
+
+    with _update_lock:
+        new_skills = sorted({vocabulary.canonical(n) for n in names} - vocabulary.skills - {""})
+        ids = vocabulary.posting_ids(names)
+
+    if new_skills:
+        try:
+            vocabulary_collection().update_one(
+                {"_id": VOCABULARY_ID},
+                {"$addToSet": {"skills": {"$each": new_skills}}},
+                upsert=True
+            )
+        except Exception as e:
+            print("Could not persist new skills:", e)
+
+    return ids
+
+
+def candidate_skill_ids(candidate):
+    ids = candidate.get("skillIds")
+    if ids is None:
+        # postings stored before skillIds existed; queries never add skills
+        ids = get_skill_vocabulary().lookup_ids(posting_skills(candidate))
+    return ids
+
+
+def skill_overlap(candidates, resume_ids):
+    """Shared skills per candidate as one sparse intersection: every
+    candidate's ids are concatenated CSR-style, tested against the resume's
+    ids at once and counted back per row."""
+    if not candidates or not resume_ids:
+        return np.zeros(len(candidates))
+
+    rows = [candidate_skill_ids(c) for c in candidates]
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+
+    flat = np.fromiter((i for r in rows for i in r), dtype=np.int64, count=int(lengths.sum()))
+    owners = np.repeat(np.arange(len(rows)), lengths)
+
+    hits = np.isin(flat, np.fromiter(resume_ids, dtype=np.int64, count=len(resume_ids)))
+
+    return np.bincount(owners[hits], minlength=len(rows)).astype(float)
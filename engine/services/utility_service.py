@@ -25,18 +25,33 @@ def parse_resume_service(uploaded_file):
         return {"message": str(e)}, 500
 
 
-def speak_service(user_text):
-    voice = "en-US-JennyNeural"
+VOICE = "en-US-JennyNeural"
+
+
+async def generate_audio(user_text, file_path):
+    tts = edge_tts.Communicate(text=user_text, voice=VOICE)
+    await tts.save(file_path)
+
 
+def speak_service(user_text):
     try:
         with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_audio:
             file_path = temp_audio.name
 
-        async def generate_audio():
-            tts = edge_tts.Communicate(text=user_text, voice=voice)
-            await tts.save(file_path)
+        asyncio.run(generate_audio(user_text, file_path))
+
+        return file_path
+
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+
+async def speak_service_async(user_text):
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_audio:
+            file_path = temp_audio.name
 
-        asyncio.run(generate_audio())
+        await generate_audio(user_text, file_path)
 
         return file_path
 
@@ -0,0 +1,63 @@
+from collections import Counter
+import numpy as np
+
+
+def unit_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def fit_centroids(vectors, k, iterations=25, seed=42):
+    """Spherical k-means: unit centroids of the embedding clusters, seeded
+    k-means++ style so small domains still get a centroid."""
+    vectors = unit_rows(vectors)
+    k = min(k, len(vectors))
+    rng = np.random.default_rng(seed)
+
+    centroids = [vectors[rng.integers(len(vectors))]]
+    closest = vectors @ centroids[0]
+    for _ in range(1, k):
+        distance = np.maximum(1.0 - closest, 0.0)
+        total = distance.sum()
+        pick = rng.choice(len(vectors), p=distance / total) if total > 0 else rng.integers(len(vectors))
+        centroids.append(vectors[pick])
+        closest = np.maximum(closest, vectors @ vectors[pick])
+    centroids = np.array(centroids)
+
+    for _ in range(iterations):
+        similarities = vectors @ centroids.T
+        assignment = similarities.argmax(axis=1)
+
+        updated = np.zeros_like(centroids)
+        np.add.at(updated, assignment, vectors)
+
+        # an emptied cluster restarts at the point its neighbours fit worst
+        empty = np.flatnonzero(np.bincount(assignment, minlength=k) == 0)
+        if len(empty):
+            worst = np.argsort(similarities.max(axis=1))[:len(empty)]
+            updated[empty] = vectors[worst]
+
+        updated = unit_rows(updated)
+        if np.allclose(updated, centroids, atol=1e-6):
+            break
+        centroids = updated
+
+    return centroids
+
+
+def nearest_categories(centroids, vectors, top=1):
+    """Ids of the `top` nearest centroids per row, best first."""
+    similarities = unit_rows(vectors) @ np.asarray(centroids, dtype=np.float32).T
+    if top == 1:
+        return similarities.argmax(axis=1)[:, None]
+    return np.argsort(-similarities, axis=1)[:, :top]
+
+
+def category_labels(assignment, names, k):
+    """Most common job role per category, for reading stats and logs."""
+    counters = [Counter() for _ in range(k)]
+    for category, name in zip(assignment, names):
+        if isinstance(name, str) and name:
+            counters[category][name] += 1
+    return [c.most_common(1)[0][0] if c else f"category {i}" for i, c in enumerate(counters)]
@@ -0,0 +1,30 @@
+import numpy as np
+
+
+def mmr_order(relevance, embeddings, lam):
+    """Maximal marginal relevance order of the rows: each pick maximizes
+    lam * relevance - (1 - lam) * (highest similarity to anything picked).
+    Relevance is min-max scaled so `lam` means the same for any score
+    range; the pairwise cosine matrix is computed once."""
+    relevance = np.asarray(relevance, dtype=np.float64)
+    spread = relevance.max() - relevance.min()
+    relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones(len(relevance))
+
+    vectors = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    similarity = vectors @ vectors.T
+
+    first = int(np.argmax(relevance))
+    order = [first]
+    picked = np.zeros(len(relevance), dtype=bool)
+    picked[first] = True
+    closest = similarity[first].astype(np.float64)
+
+    for _ in range(len(relevance) - 1):
+        gain = lam * relevance - (1.0 - lam) * closest
+        gain[picked] = -np.inf
+        pick = int(np.argmax(gain))
+        order.append(pick)
+        picked[pick] = True
+        closest = np.maximum(closest, similarity[pick])
+
+    return order
@@ -1,5 +1,9 @@
 from datetime import datetime, date
+from functools import lru_cache
 import re
+import numpy as np
+
+EPOCH = date(1970, 1, 1)
 
 def build_or_regex_for_values(values):
     if not values:
@@ -7,10 +11,10 @@ def build_or_regex_for_values(values):
     return [re.compile(f"^{re.escape(v)}$", re.IGNORECASE) for v in values]
 
 def parse_stipend_to_number(stipend_str):
-    if not stipend_str or stipend_str.lower() == "unpaid":
+    if not stipend_str or str(stipend_str).lower() == "unpaid":
         return 0
     try:
-        stipend_str = stipend_str.replace("₹", "").replace("K", "000").replace("+", "")
+        stipend_str = str(stipend_str).replace("₹", "").replace("K", "000").replace("+", "").replace(",", "")
         if "-" in stipend_str:
             parts = stipend_str.split("-")
             return int(parts[0].strip())
@@ -22,7 +26,7 @@ def parse_filter_stipend_range(stipend_filter):
     if stipend_filter.lower() == "unpaid":
         return (0, 0)
     try:
-        s = stipend_filter.replace("₹", "").replace("K", "000").replace("+", "")
+        s = stipend_filter.replace("₹", "").replace("K", "000").replace("+", "").replace(",", "")
         if "-" in s:
             mn, mx = s.split("-")
             return (int(mn.strip()), int(mx.strip()))
@@ -35,4 +39,187 @@ def last_date_is_open(last_date_str):
         last_date = datetime.strptime(last_date_str, "%d-%m-%Y")
         return last_date >= datetime.today()
     except Exception:
-        return False
\ No newline at end of file
+        return False
+
+@lru_cache(maxsize=4096)
+def parse_stipend_bounds(stipend_str):
+    """Returns (min, max) for a stipend string; max equals min for a single amount."""
+    low = parse_stipend_to_number(stipend_str)
+    if low is None:
+        return (None, None)
+    try:
+        s = str(stipend_str).replace("₹", "").replace("K", "000").replace("+", "").replace(",", "")
+        if "-" in s:
+            return (low, int(s.split("-")[1].strip()))
+    except Exception:
+        pass
+    return (low, low)
+
+@lru_cache(maxsize=4096)
+def parse_date_to_epoch_day(last_date_str):
+    try:
+        return (datetime.strptime(last_date_str, "%d-%m-%Y").date() - EPOCH).days
+    except Exception:
+        return None
+
+def today_epoch_day():
+    return (date.today() - EPOCH).days
+
+def _lowered(value):
+    return value.lower() if isinstance(value, str) else None
+
+def typed_fields(doc):
+    """Typed copies of the string metadata, written next to the originals so
+    filters never have to parse strings at query time. typeKey/jobTypeKey
+    are lowercased because $vectorSearch filters have no case-insensitive
+    match."""
+    stipend_min, stipend_max = parse_stipend_bounds(doc.get("stipend"))
+    return {
+        "stipendMin": stipend_min,
+        "stipendMax": stipend_max,
+        "lastDateDay": parse_date_to_epoch_day(doc.get("lastDate")),
+        "typeKey": _lowered(doc.get("type")),
+        "jobTypeKey": _lowered(doc.get("jobType")),
+    }
+
+
+# fields indexed as "filter" in the Atlas vector index for $vectorSearch.filter
+VECTOR_FILTER_FIELDS = ("duration", "typeKey", "jobTypeKey", "stipendMin", "lastDateDay")
+
+def vector_index_definition(dimensions=1024):
+    return {
+        "fields": [
+            {"type": "vector", "path": "embedding", "numDimensions": dimensions, "similarity": "cosine"}
+        ] + [
+            {"type": "filter", "path": path} for path in VECTOR_FILTER_FIELDS
+        ]
+    }
+
+def vector_search_filter(filters, today_day=None):
+    """Every duration/type/jobType/stipend/availability filter as one
+    $vectorSearch pre-filter, or None when nothing is filtered. Same
+    semantics as match_mask() & meta_mask()."""
+    clauses = []
+
+    if filters.get("duration"):
+        clauses.append({"duration": {"$in": list(filters["duration"])}})
+
+    type_values = [v.lower() for v in filters.get("type") or [] if isinstance(v, str)]
+    jobtype_values = [v.lower() for v in filters.get("jobType") or [] if isinstance(v, str)]
+
+    if type_values and jobtype_values:
+        clauses.append({"$or": [{"typeKey": {"$in": type_values}}, {"jobTypeKey": {"$in": jobtype_values}}]})
+    elif type_values:
+        clauses.append({"typeKey": {"$in": type_values}})
+    elif jobtype_values:
+        clauses.append({"jobTypeKey": {"$in": jobtype_values}})
+
+    stipend_ranges = parse_stipend_filters(filters.get("stipend"))
+    if stipend_ranges:
+        clauses.append({"$or": [{"stipendMin": {"$gte": mn, "$lte": mx}} for mn, mx in stipend_ranges]})
+
+    if wants_open_only(filters):
+        if today_day is None:
+            today_day = today_epoch_day()
+        clauses.append({"lastDateDay": {"$gt": today_day}})
+
+    if not clauses:
+        return None
+
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+CATEGORICAL_FIELDS = {"duration": False, "type": True, "jobType": True}  # field -> case-insensitive
+
+def _categorical_key(value, fold_case):
+    if fold_case and isinstance(value, str):
+        return value.lower()
+    return value
+
+def meta_columns(docs):
+    """The columns meta_mask() reads, taken straight from the typed fields
+    stored at ingest, by /embed and by scripts/update_vector_index.py.
+    Missing values become NaN and fail the stipend/availability filters."""
+    return {
+        "stipendMin": np.array([doc.get("stipendMin") for doc in docs], dtype=float),
+        "lastDateDay": np.array([doc.get("lastDateDay") for doc in docs], dtype=float),
+    }
+
+def build_columns(docs):
+    """meta_columns() plus the duration/type/jobType codes match_mask()
+    needs; built once per load of the local index."""
+    size = len(docs)
+    columns = meta_columns(docs)
+
+    for field, fold_case in CATEGORICAL_FIELDS.items():
+        vocab = {}
+        codes = np.empty(size, dtype=np.int32)
+        for i, doc in enumerate(docs):
+            key = _categorical_key(doc.get(field), fold_case)
+            codes[i] = vocab.setdefault(key, len(vocab))
+        columns[field] = codes
+        columns[field + "_vocab"] = vocab
+
+    return columns
+
+def category_mask(columns, field, values):
+    vocab = columns[field + "_vocab"]
+    fold_case = CATEGORICAL_FIELDS[field]
+    wanted = [vocab[k] for k in (_categorical_key(v, fold_case) for v in values) if k in vocab]
+    return np.isin(columns[field], wanted)
+
+def stipend_mask(columns, ranges):
+    stipend = columns["stipendMin"]
+    mask = np.zeros(len(stipend), dtype=bool)
+    for mn, mx in ranges:
+        mask |= (stipend >= mn) & (stipend <= mx)
+    return mask
+
+def open_mask(columns, today_day=None):
+    # lastDate is midnight of that day, so it is still open only while it lies after today
+    if today_day is None:
+        today_day = today_epoch_day()
+    return columns["lastDateDay"] > today_day
+
+def parse_stipend_filters(values):
+    ranges = []
+    for s in values or []:
+        r = parse_filter_stipend_range(str(s))
+        if r:
+            ranges.append(r)
+    return ranges
+
+def wants_open_only(filters):
+    return "open" in [x.lower() for x in filters.get("available") or []]
+
+def meta_mask(columns, filters):
+    """Stipend and availability filters as one boolean mask."""
+    mask = np.ones(len(columns["stipendMin"]), dtype=bool)
+
+    stipend_ranges = parse_stipend_filters(filters.get("stipend"))
+    if stipend_ranges:
+        mask &= stipend_mask(columns, stipend_ranges)
+
+    if wants_open_only(filters):
+        mask &= open_mask(columns)
+
+    return mask
+
+def match_mask(columns, filters):
+    """In-process equivalent of the duration/type/jobType $match stage."""
+    mask = np.ones(len(columns["stipendMin"]), dtype=bool)
+
+    if filters.get("duration"):
+        mask &= category_mask(columns, "duration", filters["duration"])
+
+    type_values = filters.get("type") or []
+    jobtype_values = filters.get("jobType") or []
+
+    if type_values and jobtype_values:
+        mask &= category_mask(columns, "type", type_values) | category_mask(columns, "jobType", jobtype_values)
+    elif type_values:
+        mask &= category_mask(columns, "type", type_values)
+    elif jobtype_values:
+        mask &= category_mask(columns, "jobType", jobtype_values)
+
+    return mask
@@ -1,4 +1,7 @@
 import math
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
 
 def haversine(coord1, coord2):
     R = 6371
@@ -8,4 +11,30 @@ def haversine(coord1, coord2):
     dphi = math.radians(lat2 - lat1)
     dlambda = math.radians(lon2 - lon1)
     a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
-    return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1 - a))
\ No newline at end of file
+    return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+def haversine_matrix(points, targets):
+    """Distances in km between every point and every target ([lon, lat] rows), shape (P, T)."""
+    points = np.radians(np.asarray(points, dtype=float).reshape(-1, 2))
+    targets = np.radians(np.asarray(targets, dtype=float).reshape(-1, 2))
+
+    lon1, lat1 = points[:, 0:1], points[:, 1:2]
+    lon2, lat2 = targets[:, 0], targets[:, 1]
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def within_radius(points, targets, radius_km):
+    """True for every point within radius_km of any target. Points with NaN coordinates never match."""
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(targets) == 0:
+        return np.zeros(len(points), dtype=bool)
+    return (haversine_matrix(points, targets) <= radius_km).any(axis=1)
+
+def point_coordinates(doc):
+    """[lon, lat] of a document's GeoJSON location, or NaNs when it has none."""
+    location = doc.get("location") or {}
+    coords = location.get("coordinates") if isinstance(location, dict) else None
+    if not coords or len(coords) != 2:
+        return [np.nan, np.nan]
+    return coords
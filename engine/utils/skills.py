@@ -0,0 +1,124 @@
+import hashlib
+import re
+from functools import lru_cache
+
+SKILL_TOKEN_PATTERN = re.compile(r"[a-z0-9+#.]+")
+
+# common spellings of the same skill; data-specific aliases live with the stored vocabulary
+BUILTIN_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "golang": "go",
+    "cpp": "c++",
+    "c plus plus": "c++",
+    "c sharp": "c#",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "expressjs": "express",
+    "express.js": "express",
+    "nextjs": "next.js",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "seo": "search engine optimization",
+}
+
+
+def normalize_skill(text):
+    """Lowercased, single-spaced skill name keeping the characters that tell
+    skills apart (c++, c#, node.js)."""
+    if not isinstance(text, str):
+        return ""
+    tokens = [t.strip(".") for t in SKILL_TOKEN_PATTERN.findall(text.lower())]
+    return " ".join(t for t in tokens if t)
+
+
+@lru_cache(maxsize=65536)
+def skill_id(name):
+    """Stable id of a canonical skill name. Hash-based, so /embed can tag a
+    new posting without coordinating ids; 48 bits stay exact through the
+    Node backend's JSON numbers."""
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=6).digest(), "big")
+
+
+def split_skills(value):
+    if isinstance(value, str):
+        return [s for s in value.split(",") if s.strip()]
+    if isinstance(value, (list, tuple)):
+        return [s for s in value if isinstance(s, str) and s.strip()]
+    return []
+
+
+def posting_skills(doc):
+    """The posting's skill names from its `skills` field. Postings without
+    one (the internship dataset has no skills column) score no overlap."""
+    return split_skills(doc.get("skills"))
+
+
+class SkillVocabulary:
+    """Canonical skill names seen in internship postings, plus aliases."""
+
+    def __init__(self, skills=(), aliases=None):
+        self.custom_aliases = dict(aliases or {})
+        self.aliases = dict(BUILTIN_ALIASES, **self.custom_aliases)
+        self.skills = set()
+        self.max_words = max((len(a.split()) for a in self.aliases), default=1)
+
+        for name in skills:
+            self.add(name)
+
+    def canonical(self, name):
+        normalized = normalize_skill(name)
+        return self.aliases.get(normalized, normalized)
+
+    def add(self, name):
+        """Adds a skill and returns its canonical name ("" when empty)."""
+        canonical = self.canonical(name)
+        if canonical:
+            self.skills.add(canonical)
+            self.max_words = max(self.max_words, len(canonical.split()))
+        return canonical
+
+    def posting_ids(self, names):
+        """Sorted skill ids of a posting; its skills join the vocabulary."""
+        return sorted({skill_id(c) for c in (self.add(n) for n in names) if c})
+
+    def lookup_ids(self, names):
+        """Sorted skill ids of the names, leaving the vocabulary unchanged."""
+        return sorted({skill_id(c) for c in (self.canonical(n) for n in names) if c})
+
+    def text_ids(self, text):
+        """Skill ids found in free text (a resume summary) by matching whole
+        word n-grams, so "c" never matches inside "communication"."""
+        tokens = [t.strip(".") for t in SKILL_TOKEN_PATTERN.findall(str(text).lower())]
+        tokens = [t for t in tokens if t]
+
+        ids = set()
+        for size in range(1, self.max_words + 1):
+            for start in range(len(tokens) - size + 1):
+                phrase = " ".join(tokens[start:start + size])
+                canonical = self.aliases.get(phrase, phrase)
+                # with no vocabulary loaded every n-gram is a candidate skill
+                if canonical in self.skills or not self.skills:
+                    ids.add(skill_id(canonical))
+
+        return ids
+
+    def to_document(self):
+        return {"skills": sorted(self.skills), "aliases": self.custom_aliases}
+
+    @classmethod
+    def from_document(cls, doc):
+        doc = doc or {}
+        return cls(doc.get("skills", []), doc.get("aliases"))
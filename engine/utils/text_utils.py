@@ -66,4 +66,121 @@ def build_resume_text(data):
                 "Technologies: " + ", ".join(proj.get("skills_used")) + "."
             )
 
-    return "\n".join(parts)
\ No newline at end of file
+    return "\n".join(parts)
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each etc few for from further
+had has have having he her here hers him his how i if in into is it its itself just like may me
+more most must my no nor not now of off on once only or other our ours out over own per same
+she should so some such than that the their theirs them then there these they this those
+through to too under until up upon us very via was we were what when where which while who
+whom why will with within without would you your yours
+ability able candidate candidates etc good great including job looking opportunity role
+responsibilities responsible required requirements skills strong team work working
+""".split())
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+SINGLE_LETTER_TERMS = frozenset({"c", "r"})
+
+
+def term_set(text):
+    """Lowercased tokens of `text` without stop words. Keeps tech tokens such
+    as c++, c#, node.js intact."""
+    if not isinstance(text, str) or not text:
+        return frozenset()
+
+    return frozenset(
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOP_WORDS and (len(token) > 1 or token in SINGLE_LETTER_TERMS)
+    )
+
+
+def json_values_text(value):
+    """Concatenated string values of a parsed JSON document. Keys are left
+    out so field names like "skills" or "education" do not count as terms."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return " ".join(json_values_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return " ".join(json_values_text(v) for v in value)
+    if value is None or isinstance(value, bool):
+        return ""
+    return str(value)
+
+
+def _joined(values):
+    return ", ".join(str(v) for v in values if v)
+
+
+def _items(value):
+    """A JSON list field as a list; null or a scalar becomes []."""
+    return value if isinstance(value, list) else []
+
+
+def _entries(data, key):
+    """Dict entries of a list field; parsers sometimes emit plain strings or nulls."""
+    return [entry for entry in _items(data.get(key)) if isinstance(entry, dict)]
+
+
+def build_rerank_text(data, max_chars=1500):
+    """Short plain-text resume for the cross-encoder, most discriminative
+    sections first (skills, roles, projects, education, then responsibilities)
+    and cut at a word boundary after `max_chars`. Missing, null or oddly
+    typed fields are skipped, never raised on."""
+    if not isinstance(data, dict):
+        text = re.sub(r"\s+", " ", json_values_text(data)).strip()
+        return _truncate(text, max_chars)
+
+    parts = []
+
+    skills = []
+    for cat in _items(data.get("skills")):
+        if isinstance(cat, dict):
+            skills.extend(v for v in _items(cat.get("items")) if isinstance(v, str))
+        elif isinstance(cat, str) and cat:
+            skills.append(cat)
+    if skills:
+        parts.append(f"Skills: {_joined(dict.fromkeys(skills))}.")
+
+    roles = [
+        " at ".join(str(v) for v in (exp.get("role"), exp.get("organization")) if v)
+        for exp in _entries(data, "experience")
+    ]
+    # experience given as plain strings still counts as roles
+    roles += [exp for exp in _items(data.get("experience")) if isinstance(exp, str)]
+    if any(roles):
+        parts.append(f"Experience: {'; '.join(r for r in roles if r)}.")
+
+    for proj in _entries(data, "projects"):
+        if not proj.get("name") and not proj.get("description"):
+            continue
+        used = _joined(_items(proj.get("skills_used")))
+        parts.append(
+            f"Project: {proj.get('name') or ''} - {str(proj.get('description') or '').rstrip('.')}"
+            + (f" ({used})." if used else ".")
+        )
+
+    for edu in _entries(data, "education"):
+        parts.append(
+            f"Education: {edu.get('degree') or ''} in {edu.get('field_of_study') or ''} at {edu.get('institution') or ''}."
+        )
+
+    for exp in _entries(data, "experience"):
+        for resp in _items(exp.get("responsibilities")):
+            if resp:
+                parts.append(f"{str(resp).rstrip('.')}.")
+
+    text = re.sub(r"\s+", " ", " ".join(parts)).strip()
+
+    return _truncate(text, max_chars)
+
+
+def _truncate(text, max_chars):
+    if len(text) <= max_chars:
+        return text
+
+    cut = text.rfind(" ", 0, max_chars)
+    return text[:cut if cut > 0 else max_chars]
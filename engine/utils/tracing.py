@@ -0,0 +1,194 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Prometheus histogram buckets (seconds) for request and stage durations
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+current_trace = ContextVar("current_trace", default=None)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+class Registry:
+    """Process-wide stage and request timings plus candidate counts."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.requests = {}
+        self.items_in = {}
+        self.items_out = {}
+        self.errors = {}
+
+    def observe_stage(self, name, seconds, items_in=None, items_out=None, failed=False):
+        with self.lock:
+            self.stages.setdefault(name, Histogram()).observe(seconds)
+            if items_in is not None:
+                self.items_in[name] = self.items_in.get(name, 0) + items_in
+            if items_out is not None:
+                self.items_out[name] = self.items_out.get(name, 0) + items_out
+            if failed:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def observe_request(self, endpoint, status, seconds):
+        with self.lock:
+            self.requests.setdefault((endpoint, status), Histogram()).observe(seconds)
+
+    def lines(self):
+        with self.lock:
+            yield "# TYPE engine_stage_duration_seconds histogram"
+            for name, hist in sorted(self.stages.items()):
+                yield from hist.lines("engine_stage_duration_seconds", f'stage="{name}"')
+
+            yield "# TYPE engine_stage_items_in_total counter"
+            for name, value in sorted(self.items_in.items()):
+                yield f'engine_stage_items_in_total{{stage="{name}"}} {value}'
+
+            yield "# TYPE engine_stage_items_out_total counter"
+            for name, value in sorted(self.items_out.items()):
+                yield f'engine_stage_items_out_total{{stage="{name}"}} {value}'
+
+            yield "# TYPE engine_stage_errors_total counter"
+            for name, value in sorted(self.errors.items()):
+                yield f'engine_stage_errors_total{{stage="{name}"}} {value}'
+
+            yield "# TYPE engine_request_duration_seconds histogram"
+            for (endpoint, status), hist in sorted(self.requests.items()):
+                yield from hist.lines(
+                    "engine_request_duration_seconds",
+                    f'endpoint="{endpoint}",status="{status}"'
+                )
+
+
+registry = Registry()
+
+
+class Span:
+    def __init__(self, name, items_in=None):
+        self.name = name
+        self.items_in = items_in
+        self.items_out = None
+        self.seconds = 0.0
+
+    def out(self, items_out):
+        """Records how many candidates survived the stage."""
+        self.items_out = items_out
+
+
+class Trace:
+    """Stages of one request, in the order they finished."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.spans = []
+
+    def add(self, span):
+        with self.lock:
+            self.spans.append(span)
+
+    def server_timing(self):
+        with self.lock:
+            spans = list(self.spans)
+
+        # repeated stages (e.g. one rerank per chunk) are summed into one entry
+        totals = {}
+        for span in spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.seconds
+
+        parts = [f"{name.replace('.', '-')};dur={1000 * seconds:.1f}" for name, seconds in totals.items()]
+        parts.append(f"total;dur={1000 * (time.perf_counter() - self.started):.1f}")
+        return ", ".join(parts)
+
+
+@contextmanager
+def stage(name, items_in=None):
+    """Times a pipeline stage into the process metrics and, inside a request,
+    into its Server-Timing trace. Works in sync and async code; asyncio
+    tasks and asyncio.to_thread() calls inherit the request's trace, but
+    plain threads and ThreadPoolExecutor workers do not (submit through
+    contextvars.copy_context().run to keep it), so their stages only reach
+    the process metrics."""
+    span = Span(name, items_in)
+    start = time.perf_counter()
+    failed = False
+
+    try:
+        yield span
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        span.seconds = time.perf_counter() - start
+        registry.observe_stage(name, span.seconds, span.items_in, span.items_out, failed)
+
+        trace = current_trace.get()
+        if trace is not None:
+            trace.add(span)
+
+
+def start_trace():
+    trace = Trace()
+    current_trace.set(trace)
+    return trace
+
+
+def finish_trace(response, endpoint, server_timing=False):
+    """Records the request duration and, when enabled, adds the
+    Server-Timing header. Takes Flask and Quart responses alike."""
+    trace = current_trace.get()
+    if trace is None:
+        return response
+
+    registry.observe_request(endpoint or "unknown", response.status_code, time.perf_counter() - trace.started)
+
+    if server_timing:
+        response.headers["Server-Timing"] = trace.server_timing()
+
+    current_trace.set(None)
+    return response
+
+
+def gauge_lines(component, stats, labels=""):
+    """Numeric entries of a stats() dict as Prometheus gauges."""
+    for key, value in sorted(stats.items()):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        label_text = f"{{{labels}}}" if labels else ""
+        yield f"engine_{component}_{key}{label_text} {value}"
+
+
+def render_metrics(components=()):
+    """Prometheus text format: stage and request metrics, then one gauge per
+    numeric field of each (component, stats, labels) entry."""
+    lines = list(registry.lines())
+
+    for component, stats, labels in components:
+        lines.extend(gauge_lines(component, stats, labels))
+
+    return "\n".join(lines) + "\n"